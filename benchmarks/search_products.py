@@ -0,0 +1,59 @@
+"""
+Latency of GET /products/search and GET /products/autocomplete.
+
+Run ```python -m benchmarks.search_products --query lamp --prefix la```
+against the database configured in .env. Exits with 1 when a p99 is over
+its target.
+"""
+# Python
+import sys
+from argparse import ArgumentParser
+
+# FastAPI
+from fastapi.testclient import TestClient
+
+# app
+from main import app
+
+# benchmarks
+from benchmarks.util import measure, report
+
+
+SEARCH_P99_TARGET_MS = 50
+AUTOCOMPLETE_P99_TARGET_MS = 20
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--query", default="test product")
+    parser.add_argument("--prefix", default="te")
+    parser.add_argument("--shop-id", default=None)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    shop_param = {"shop_id": args.shop_id} if args.shop_id else {}
+
+    with TestClient(app) as client:
+        search = measure(
+            lambda: client.get(
+                url = "products/search",
+                params = {"q": args.query, **shop_param}
+            ),
+            args.runs
+        )
+        autocomplete = measure(
+            lambda: client.get(
+                url = "products/autocomplete",
+                params = {"prefix": args.prefix, **shop_param}
+            ),
+            args.runs
+        )
+
+    passed = report("search", search, SEARCH_P99_TARGET_MS)
+    passed = report("autocomplete", autocomplete, AUTOCOMPLETE_P99_TARGET_MS) and passed
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
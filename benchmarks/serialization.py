@@ -0,0 +1,70 @@
+"""
+Per-item cost of turning stored product documents into a JSON body.
+
+Run ```python -m benchmarks.serialization```. Needs no database:
+- before: build ProductDb in the handler, validate it again for
+  response_model and encode with jsonable_encoder + json.dumps.
+- after: util.responses.trusted_list + orjson.
+"""
+# Python
+import json
+from argparse import ArgumentParser
+from random import randint
+
+# FastAPI
+from fastapi.encoders import jsonable_encoder
+
+# orjson
+import orjson
+
+# models
+from models.product import ProductDb
+
+# util
+from util.responses import trusted_list
+
+# benchmarks
+from benchmarks.util import measure, report
+
+
+def build_documents(count: int):
+    return [
+        ProductDb(
+            name = f'Product {index}',
+            price = randint(1, 1000),
+            stock = randint(1, 50),
+            description = "A product used to measure serialization",
+            collection = "Home & Deco",
+            img = "http://example-url.com",
+            shop_id = "65133250769b9799befb1630"
+        ).model_dump()
+        for index in range(count)
+    ]
+
+
+def validated_body(documents: list[dict]):
+    products = [ProductDb(**document) for document in documents]
+    products = [ProductDb.model_validate(product.model_dump()) for product in products]
+    return json.dumps(jsonable_encoder({"items": products})).encode()
+
+
+def trusted_body(documents: list[dict]):
+    return orjson.dumps({"items": trusted_list(ProductDb, documents)})
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    documents = build_documents(args.items)
+
+    for name, function in (("validated", validated_body), ("trusted", trusted_body)):
+        latencies = measure(lambda: function(documents), args.runs)
+        per_item = [latency * 1000 / args.items for latency in latencies]
+        report(f'{name} per item', per_item, unit="us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# Python
+from statistics import quantiles
+from time import perf_counter
+
+
+def measure(function, runs: int):
+    """
+    Calls ``function`` ``runs`` times and returns the latencies in ms.
+    """
+    latencies = []
+    for _ in range(runs):
+        start = perf_counter()
+        function()
+        latencies.append((perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: list[float], p99_target: float = None, unit: str = "ms"):
+    """
+    Prints p50/p95/p99 of ``latencies`` and returns False if the p99 is over
+    ``p99_target`` (in ``unit``).
+    """
+    cuts = quantiles(latencies, n=100)
+    p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+
+    line = f'{name}: p50={p50:.2f}{unit} p95={p95:.2f}{unit} p99={p99:.2f}{unit}'
+    if p99_target is None:
+        print(line)
+        return True
+
+    passed = p99 <= p99_target
+    print(f'{line} target={p99_target:.2f}{unit} {"OK" if passed else "FAIL"}')
+    return passed
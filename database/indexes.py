@@ -0,0 +1,286 @@
+# Python
+from collections import Counter
+
+# PyMongo
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, UpdateOne
+
+# database
+from database.mongo_client import AsyncMongoDB
+
+# util
+from util.exists import USERNAME_COLLATION
+
+
+INDEXES = {
+    "users_db": [
+        IndexModel([("id", ASCENDING)], name="id", unique=True),
+        # case-insensitive lookups, only used by queries with the same collation
+        IndexModel(
+            [("username", ASCENDING)],
+            name = "username",
+            collation = USERNAME_COLLATION
+        ),
+        # exact lookups: login, get_current_user, get_users by username
+        IndexModel([("username", ASCENDING)], name="username_exact")
+    ],
+    "shops_db": [
+        IndexModel([("id", ASCENDING)], name="id", unique=True),
+        IndexModel([("name", ASCENDING)], name="name"),
+        # only the shops whose cleanup is still running
+        IndexModel(
+            [("deleted", ASCENDING)],
+            name = "deleted",
+            partialFilterExpression = {"deleted": True}
+        )
+    ],
+    "products_db": [
+        IndexModel([("id", ASCENDING)], name="id", unique=True),
+        IndexModel(
+            [("shop_id", ASCENDING), ("id", ASCENDING)],
+            name = "shop_id_id"
+        ),
+        IndexModel(
+            [("shop_id", ASCENDING), ("name", ASCENDING), ("id", ASCENDING)],
+            name = "shop_id_name_id"
+        ),
+        IndexModel(
+            [("shop_id", ASCENDING), ("collection", ASCENDING)],
+            name = "shop_id_collection"
+        ),
+        IndexModel([("name_lower", ASCENDING)], name="name_lower"),
+        IndexModel(
+            [("shop_id", ASCENDING), ("name_lower", ASCENDING)],
+            name = "shop_id_name_lower"
+        ),
+        IndexModel(
+            [("name", TEXT), ("description", TEXT), ("collection", TEXT)],
+            name = "search",
+            weights = {"name": 10, "collection": 3, "description": 1}
+        )
+    ],
+    "carts_db": [
+        IndexModel([("id", ASCENDING)], name="id", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="user_id", unique=True),
+        IndexModel([("shop_ids", ASCENDING)], name="shop_ids")
+    ],
+    "jobs_db": [
+        IndexModel([("id", ASCENDING)], name="id", unique=True),
+        IndexModel(
+            [("shop_id", ASCENDING), ("created", ASCENDING)],
+            name = "shop_id_created"
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("updated", ASCENDING)],
+            name = "status_updated"
+        )
+    ],
+    "sales_db": [
+        IndexModel(
+            [("shop_id", ASCENDING), ("day", ASCENDING)],
+            name = "shop_id_day",
+            unique = True
+        )
+    ],
+    "tickets_db": [
+        IndexModel(
+            [("user_id", ASCENDING), ("release_date", DESCENDING), ("id", DESCENDING)],
+            name = "user_id_release_date_id"
+        ),
+        IndexModel(
+            [("items.shop_id", ASCENDING), ("release_date", DESCENDING), ("id", DESCENDING)],
+            name = "items_shop_id_release_date_id"
+        )
+    ]
+}
+
+
+async def create_indexes(db_client: AsyncMongoDB):
+    """
+    Builds the indexes that don't exist yet. Before a unique index is
+    built for the first time, the documents it would reject are merged
+    where a migration exists, or reported with a clear error.
+    """
+    for name, indexes in INDEXES.items():
+        collection = getattr(db_client, name)
+        existing = await collection.index_information()
+        indexes = [
+            index for index in indexes
+            if index.document["name"] not in existing
+        ]
+        if not indexes:
+            continue
+
+        for index in indexes:
+            if not index.document.get("unique"):
+                continue
+            deduplicate = DEDUPLICATE.get((name, index.document["name"]))
+            if deduplicate is not None:
+                await deduplicate(db_client)
+            await verify_unique(collection, index)
+
+        await collection.create_indexes(indexes)
+
+
+async def verify_unique(collection, index: IndexModel):
+    """
+    Fails with the duplicated values instead of a bare DuplicateKeyError
+    when ``index`` can't be built. Older versions accepted client IDs for
+    users and products without checking that they were free.
+    """
+    fields = list(index.document["key"])
+    duplicates = await duplicate_values(collection, fields)
+    if duplicates:
+        raise RuntimeError(
+            f'Can\'t build the unique index "{index.document["name"]}" of '
+            f'{collection.name}: {len(duplicates)} values of {", ".join(fields)} '
+            f'are repeated, e.g. {duplicates[:10]}. Remove or rename the '
+            f'duplicated documents and restart.'
+        )
+
+
+async def duplicate_values(collection, fields: list[str]):
+    """
+    Values of ``fields`` shared by more than one document, as
+    ``{field: value}`` dicts.
+    """
+    groups = await collection.aggregate(
+        [
+            {
+                "$group": {
+                    "_id": {field: f'${field}' for field in fields},
+                    "count": {"$sum": 1}
+                }
+            },
+            {"$match": {"count": {"$gt": 1}}}
+        ],
+        allowDiskUse = True
+    )
+    return [group["_id"] for group in groups]
+
+
+async def merge_duplicate_carts(db_client: AsyncMongoDB):
+    """
+    Before add-to-cart became an atomic upsert, parallel requests could
+    create several carts for one user. Merges them into one, adding up
+    the quantities of the lines they share.
+    """
+    await migrate_list_carts(db_client)
+
+    for duplicate in await duplicate_values(db_client.carts_db, ["user_id"]):
+        carts = await db_client.carts_db.find(
+            duplicate,
+            {"id": 1, "products": 1, "_id": 0},
+            sort = [("id", ASCENDING)]
+        )
+
+        products = {}
+        for cart in carts:
+            lines = cart.get("products")
+            if not isinstance(lines, dict):
+                continue
+            for product_id, item in lines.items():
+                if product_id in products:
+                    products[product_id]["quantity"] += item["quantity"]
+                else:
+                    products[product_id] = dict(item)
+        shop_ids = sorted(
+            {item["shop_id"] for item in products.values() if item.get("shop_id")}
+        )
+
+        kept_id = carts[0]["id"]
+        await db_client.carts_db.update_one(
+            {"id": kept_id},
+            {"$set": {"products": products, "shop_ids": shop_ids}}
+        )
+        await db_client.carts_db.delete_many(
+            {**duplicate, "id": {"$ne": kept_id}}
+        )
+
+
+async def backfill_fields(db_client: AsyncMongoDB):
+    """
+    Adds the derived fields that newer code writes to documents stored
+    before they existed. Each update only touches documents still missing
+    the field, so it is cheap once they are all migrated.
+    """
+    await db_client.products_db.update_many(
+        {"name_lower": {"$exists": False}},
+        [{"$set": {"name_lower": {"$toLower": "$name"}}}]
+    )
+    await db_client.tickets_db.update_many(
+        {"release_date": {"$type": "string"}},
+        [
+            {
+                "$set": {
+                    "release_date": {
+                        "$dateFromString": {
+                            "dateString": "$release_date",
+                            "onError": "$release_date"
+                        }
+                    }
+                }
+            }
+        ]
+    )
+    await migrate_list_carts(db_client)
+
+
+async def migrate_list_carts(db_client: AsyncMongoDB):
+    """
+    Carts stored before line items kept a list with one product ID per
+    unit. Turns them into ``{product_id: CartItem}`` lines priced at the
+    current price of the product; products that no longer exist are
+    dropped from the cart.
+    """
+    batches = db_client.carts_db.find_batches(
+        {"products": {"$type": "array"}},
+        {"id": 1, "products": 1, "_id": 0}
+    )
+    async for carts in batches:
+        ids = {
+            id
+            for cart in carts
+            for id in cart["products"]
+            if isinstance(id, str)
+        }
+        products = await db_client.products_db.find(
+            {"id": {"$in": list(ids)}},
+            {"id": 1, "price": 1, "shop_id": 1, "_id": 0}
+        )
+        products = {product["id"]: product for product in products}
+
+        operations = []
+        for cart in carts:
+            quantities = Counter(
+                id
+                for id in cart["products"]
+                if isinstance(id, str) and id in products
+            )
+            items = {
+                id: {
+                    "quantity": quantity,
+                    "unit_price": products[id]["price"],
+                    "shop_id": products[id].get("shop_id")
+                }
+                for id, quantity in quantities.items()
+            }
+            shop_ids = sorted(
+                {item["shop_id"] for item in items.values() if item["shop_id"]}
+            )
+            operations.append(
+                UpdateOne(
+                    {"id": cart["id"], "products": {"$type": "array"}},
+                    {
+                        "$set": {"products": items, "shop_ids": shop_ids},
+                        "$unset": {"total": ""}
+                    }
+                )
+            )
+        await db_client.carts_db.bulk_write(operations, ordered=False)
+
+
+# (collection, index name) -> migration that removes the duplicates the
+# unique index would reject
+DEDUPLICATE = {
+    ("carts_db", "user_id"): merge_duplicate_carts
+}
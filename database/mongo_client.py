@@ -1,27 +1,186 @@
+# Python
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from threading import Lock
+
 # PyMongo
 from pymongo import MongoClient
+from pymongo.collection import Collection
 
 # security
 from security.config import settings
 
+# database
+from database.monitoring import command_metrics
+
+
+_clients: dict[str, MongoClient] = {}
+_clients_lock = Lock()
+
+_executor = ThreadPoolExecutor(
+    max_workers = settings.mongodb_executor_workers,
+    thread_name_prefix = "mongodb"
+)
+
+
+def get_client(url: str):
+    """
+    Returns the process-wide MongoClient for ``url``, creating it on first
+    use. Every MongoDB instance shares the same connection pool.
+    """
+    client = _clients.get(url)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        if url not in _clients:
+            _clients[url] = MongoClient(
+                url,
+                maxPoolSize = settings.mongodb_max_pool_size,
+                minPoolSize = settings.mongodb_min_pool_size,
+                maxIdleTimeMS = settings.mongodb_max_idle_time_ms,
+                connectTimeoutMS = settings.mongodb_connect_timeout_ms,
+                serverSelectionTimeoutMS = settings.mongodb_server_selection_timeout_ms,
+                socketTimeoutMS = settings.mongodb_socket_timeout_ms,
+                event_listeners = [command_metrics]
+            )
+        return _clients[url]
+
+
+def close_clients():
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+def get_database():
+    username = settings.mongodb_user
+    password = settings.mongodb_password
+    host = settings.mongodb_host
+    test = settings.is_test_db
+    
+    atlas_url = f'mongodb+srv://{username}:{password}{host}'
+    
+    if test:
+        return get_client(atlas_url).test
+    return get_client(atlas_url).production
+
+
+async def run_in_executor(function, *args, **kwargs):
+    """
+    Runs a blocking PyMongo call in the MongoDB thread pool so the event
+    loop keeps serving other requests while the round-trip is in flight.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor,
+        partial(function, *args, **kwargs)
+    )
+
+
+class AsyncCollection:
+    """
+    Awaitable facade over a PyMongo collection. ``find`` returns a list
+    instead of a cursor, so pass ``sort``, ``limit``, etc. as keywords.
+    """
+
+    def __init__(self, collection: Collection):
+        self.__collection = collection
+
+    @property
+    def name(self):
+        return self.__collection.name
+
+    async def find(self, *args, **kwargs):
+        return await run_in_executor(
+            lambda: list(self.__collection.find(*args, **kwargs))
+        )
+
+    async def find_batches(self, *args, batch_size: int = 1000, **kwargs):
+        """
+        Iterates the result of ``find`` in lists of up to ``batch_size``
+        documents, holding only one batch in memory at a time.
+        """
+        cursor = self.__collection.find(*args, batch_size=batch_size, **kwargs)
+        try:
+            while True:
+                batch = await run_in_executor(
+                    lambda: list(islice(cursor, batch_size))
+                )
+                if not batch:
+                    break
+                yield batch
+        finally:
+            await run_in_executor(cursor.close)
+
+    async def aggregate(self, *args, **kwargs):
+        return await run_in_executor(
+            lambda: list(self.__collection.aggregate(*args, **kwargs))
+        )
+
+    async def find_one(self, *args, **kwargs):
+        return await run_in_executor(self.__collection.find_one, *args, **kwargs)
+
+    async def insert_one(self, *args, **kwargs):
+        return await run_in_executor(self.__collection.insert_one, *args, **kwargs)
+
+    async def insert_many(self, *args, **kwargs):
+        return await run_in_executor(self.__collection.insert_many, *args, **kwargs)
+
+    async def update_one(self, *args, **kwargs):
+        return await run_in_executor(self.__collection.update_one, *args, **kwargs)
+
+    async def update_many(self, *args, **kwargs):
+        return await run_in_executor(self.__collection.update_many, *args, **kwargs)
+
+    async def find_one_and_update(self, *args, **kwargs):
+        return await run_in_executor(self.__collection.find_one_and_update, *args, **kwargs)
+
+    async def find_one_and_delete(self, *args, **kwargs):
+        return await run_in_executor(self.__collection.find_one_and_delete, *args, **kwargs)
+
+    async def delete_one(self, *args, **kwargs):
+        return await run_in_executor(self.__collection.delete_one, *args, **kwargs)
+
+    async def delete_many(self, *args, **kwargs):
+        return await run_in_executor(self.__collection.delete_many, *args, **kwargs)
+
+    async def bulk_write(self, *args, **kwargs):
+        return await run_in_executor(self.__collection.bulk_write, *args, **kwargs)
+
+    async def index_information(self):
+        return await run_in_executor(self.__collection.index_information)
+
+    async def create_indexes(self, *args, **kwargs):
+        return await run_in_executor(self.__collection.create_indexes, *args, **kwargs)
+
 
 class MongoDB:
 
     def __init__(self):
-        username = settings.mongodb_user
-        password = settings.mongodb_password
-        host = settings.mongodb_host
-        test = settings.is_test_db
-        
-        atlas_url = f'mongodb+srv://{username}:{password}{host}'
-        
-        if test:
-            self.__db_client = MongoClient(atlas_url).test
-        else:
-            self.__db_client = MongoClient(atlas_url).production
+        self.__db_client = get_database()
         
         self.users_db = self.__db_client.users
         self.shops_db = self.__db_client.shops
         self.products_db = self.__db_client.products
         self.carts_db = self.__db_client.carts
         self.tickets_db = self.__db_client.tickets
+        self.jobs_db = self.__db_client.jobs
+        self.sales_db = self.__db_client.sales
+
+
+class AsyncMongoDB:
+
+    def __init__(self):
+        db_client = MongoDB()
+
+        self.users_db = AsyncCollection(db_client.users_db)
+        self.shops_db = AsyncCollection(db_client.shops_db)
+        self.products_db = AsyncCollection(db_client.products_db)
+        self.carts_db = AsyncCollection(db_client.carts_db)
+        self.tickets_db = AsyncCollection(db_client.tickets_db)
+        self.jobs_db = AsyncCollection(db_client.jobs_db)
+        self.sales_db = AsyncCollection(db_client.sales_db)
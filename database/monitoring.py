@@ -0,0 +1,75 @@
+# Python
+from threading import Lock
+
+# PyMongo
+from pymongo import monitoring
+
+# Prometheus
+from prometheus_client import Counter, Histogram
+
+
+MONGODB_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5
+)
+
+COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds",
+    "Duration of MongoDB commands",
+    ["collection", "command"],
+    buckets = MONGODB_BUCKETS
+)
+COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total",
+    "MongoDB commands that returned an error",
+    ["collection", "command"]
+)
+
+
+def command_collection(command_name: str, command: dict):
+    """
+    Collection a command runs on: the value of the command's own key for
+    find, insert, update, aggregate... and ``collection`` for getMore.
+    """
+    if command_name == "getMore":
+        return command.get("collection", "")
+    value = command.get(command_name)
+    return value if isinstance(value, str) else ""
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Records the duration of every command of a MongoClient by collection
+    and command name. The collection only comes in the started event, so
+    it is kept until the command finishes. Events arrive from the
+    executor threads.
+    """
+
+    def __init__(self):
+        self.__started: dict[tuple, tuple] = {}
+        self.__lock = Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        labels = (
+            command_collection(event.command_name, event.command),
+            event.command_name
+        )
+        with self.__lock:
+            self.__started[(event.connection_id, event.request_id)] = labels
+
+    def __labels(self, event):
+        with self.__lock:
+            labels = self.__started.pop((event.connection_id, event.request_id), None)
+        return labels or ("", event.command_name)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        COMMAND_DURATION.labels(*self.__labels(event)).observe(
+            event.duration_micros / 1000000
+        )
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        labels = self.__labels(event)
+        COMMAND_DURATION.labels(*labels).observe(event.duration_micros / 1000000)
+        COMMAND_FAILURES.labels(*labels).inc()
+
+
+command_metrics = CommandMetrics()
@@ -1,37 +1,48 @@
 # FastAPI
 from fastapi import FastAPI
-from fastapi_limiter import FastAPILimiter
-
-# Redis
-import redis
+from fastapi.responses import ORJSONResponse
 
 # security
-from security.config import settings
+from security.rate_limiter import init_redis, close_redis
+
+# database
+from database.mongo_client import AsyncMongoDB, close_clients
+from database.indexes import create_indexes, backfill_fields
 
 # routers
-from routers import users, token, shops, products, carts
+from routers import users, token, shops, products, carts, tickets, stats, metrics
 
+# util
+from util.metrics import MetricsMiddleware
+from util.shop_deletion import start_shop_deletion_watcher, stop_shop_deletion_watcher
 
-app = FastAPI()
+
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_middleware(MetricsMiddleware)
 app.include_router(users.router)
 app.include_router(token.router)
 app.include_router(shops.router)
 app.include_router(products.router)
 app.include_router(carts.router)
+app.include_router(tickets.router)
+app.include_router(stats.router)
+app.include_router(metrics.router)
 
 
 @app.on_event("startup")
 async def startup():
-    r = redis.Redis(
-        host = settings.redis_limiter_host,
-        port = settings.redis_limiter_port,
-        password = settings.redis_limiter_password
-    )
-    await FastAPILimiter.init(r)
+    db_client = AsyncMongoDB()
+    await create_indexes(db_client)
+    await backfill_fields(db_client)
+
+    await init_redis()
+    start_shop_deletion_watcher()
 
 @app.on_event("shutdown")
 async def shutdown():
-    await FastAPILimiter.close()
+    stop_shop_deletion_watcher()
+    await close_redis()
+    close_clients()
 
 
 @app.get(
@@ -0,0 +1,50 @@
+# Python
+from typing import Union
+
+# Pydantic
+from pydantic import BaseModel, Field, model_validator
+
+
+class RowError(BaseModel):
+    row: int = Field(...)
+    errors: list[dict] = Field(default_factory=lambda: [])
+
+class ImportReport(BaseModel):
+    inserted: int = Field(default=0)
+    errors: list[RowError] = Field(default_factory=lambda: [])
+
+class ProductChange(BaseModel):
+    product_id: Union[str, None] = Field(default=None)
+    collection: Union[str, None] = Field(default=None)
+    set_stock: Union[int, None] = Field(
+        default = None,
+        ge = 0
+    )
+    adjust_stock: Union[int, None] = Field(default=None)
+    set_price: Union[float, None] = Field(
+        default = None,
+        gt = 0
+    )
+
+    @model_validator(mode="after")
+    def check_change(self):
+        if (self.product_id is None) == (self.collection is None):
+            raise ValueError("Set exactly one of product_id or collection")
+        if self.set_stock is not None and self.adjust_stock is not None:
+            raise ValueError("Set only one of set_stock or adjust_stock")
+        if self.set_stock is None and self.adjust_stock is None and self.set_price is None:
+            raise ValueError("Set at least one of set_stock, adjust_stock or set_price")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "product_id": "65133250769b9799befb1631",
+                "adjust_stock": -2,
+                "set_price": 30.5
+            }
+        }
+
+class MutationReport(BaseModel):
+    matched: int = Field(default=0)
+    modified: int = Field(default=0)
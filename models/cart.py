@@ -3,11 +3,28 @@ from bson import ObjectId
 from typing import Union
 
 # Pydantic
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 
 
+class CartItem(BaseModel):
+    quantity: int = Field(
+        ...,
+        gt = 0
+    )
+    unit_price: float = Field(
+        ...,
+        gt = 0
+    )
+    shop_id: Union[str, None] = Field(default=None)
+
 class Cart(BaseModel):
     id: str = Field(default_factory=lambda: str(ObjectId()))
     user_id: str = Field(...)
-    products: Union[list[str], list] = Field(default=[])
-    total: float = Field(default=0)
\ No newline at end of file
+    products: dict[str, CartItem] = Field(default_factory=lambda: {})
+
+    @computed_field
+    @property
+    def total(self) -> float:
+        return sum(
+            item.quantity * item.unit_price for item in self.products.values()
+        )
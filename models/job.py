@@ -0,0 +1,31 @@
+# Python
+from enum import Enum
+from datetime import datetime
+from bson import ObjectId
+from typing import Union
+
+# Pydantic
+from pydantic import BaseModel, Field
+
+
+class TypeJob(str, Enum):
+    delete_shop = "delete_shop"
+
+class StatusJob(str, Enum):
+    pending = "pending"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+class Job(BaseModel):
+    id: str = Field(default_factory=lambda: str(ObjectId()))
+    type: TypeJob = Field()
+    status: StatusJob = Field(default=StatusJob.pending)
+    shop_id: Union[str, None] = Field(default=None)
+    owner_id: Union[str, None] = Field(default=None)
+    deleted_products: int = Field(default=0)
+    cleaned_carts: int = Field(default=0)
+    attempts: int = Field(default=0)
+    error: Union[str, None] = Field(default=None)
+    created: datetime = Field(default_factory=datetime.utcnow)
+    updated: datetime = Field(default_factory=datetime.utcnow)
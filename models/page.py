@@ -0,0 +1,10 @@
+# Python
+from typing import Union
+
+# Pydantic
+from pydantic import BaseModel, Field
+
+
+class Page(BaseModel):
+    items: list = Field(default_factory=lambda: [])
+    next_cursor: Union[str, None] = Field(default=None)
@@ -6,8 +6,16 @@ from typing import Union
 from pydantic import BaseModel, Field
 
 
+# product IDs are used as keys of cart lines and sales rollups, i.e. in
+# MongoDB field paths, so they can't contain "." or start with "$"
+PRODUCT_ID_PATTERN = r'^[0-9a-f]{24}$'
+
+
 class Product(BaseModel):
-    id: str = Field(default_factory=lambda: str(ObjectId()))
+    id: str = Field(
+        default_factory = lambda: str(ObjectId()),
+        pattern = PRODUCT_ID_PATTERN
+    )
     name: str = Field(...)
     price: float = Field(
         ...,
@@ -35,4 +43,12 @@ class Product(BaseModel):
         }
 
 class ProductDb(Product):
+    shop_id: Union[str, None] = Field(default=None)
+
+class ProductSearchResult(ProductDb):
+    score: float = Field(default=0)
+
+class ProductSuggestion(BaseModel):
+    id: str = Field(...)
+    name: str = Field(...)
     shop_id: Union[str, None] = Field(default=None)
\ No newline at end of file
@@ -0,0 +1,26 @@
+# Python
+from datetime import date
+
+# Pydantic
+from pydantic import BaseModel, Field
+
+
+class ProductSales(BaseModel):
+    product_id: str = Field(...)
+    name: str = Field(...)
+    units: int = Field(default=0)
+    revenue: float = Field(default=0)
+
+class DailySales(BaseModel):
+    day: date = Field(...)
+    units: int = Field(default=0)
+    revenue: float = Field(default=0)
+
+class SalesReport(BaseModel):
+    shop_id: str = Field(...)
+    start: date = Field(...)
+    end: date = Field(...)
+    units: int = Field(default=0)
+    revenue: float = Field(default=0)
+    days: list[DailySales] = Field(default_factory=lambda: [])
+    top_products: list[ProductSales] = Field(default_factory=lambda: [])
@@ -1,6 +1,6 @@
 # Python
 from enum import Enum
-from datetime import date, datetime
+from datetime import datetime
 from bson import ObjectId
 from typing import Union
 
@@ -12,10 +12,17 @@ class TypeTicket(str, Enum):
     sale = "sale"
     purchase = "purchase"
 
+class TicketItem(BaseModel):
+    product_id: str = Field(...)
+    name: str = Field(...)
+    shop_id: Union[str, None] = Field(default=None)
+    quantity: int = Field(...)
+    unit_price: float = Field(...)
+
 class Ticket(BaseModel):
     id: str = Field(default_factory=lambda: str(ObjectId()))
     user_id: Union[str, None] = Field(default=None)
-    release_date: Union[date, str] = Field(default_factory = lambda: str(datetime.now()))
+    release_date: datetime = Field(default_factory=datetime.utcnow)
     type: TypeTicket = Field()
-    items: list = Field(default_factory=lambda: [])
+    items: list[TicketItem] = Field(default_factory=lambda: [])
     price: float = Field(default=0)
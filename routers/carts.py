@@ -1,32 +1,57 @@
 # Python
-# from bson import ObjectId
+import re
+from bson import ObjectId
 
 # FastAPI
 from fastapi import APIRouter, Path, Depends
 from fastapi import HTTPException, status
 
+# PyMongo
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
 # database
-from database.mongo_client import MongoDB
+from database.mongo_client import AsyncMongoDB
 
 # security
 from security.auth import get_current_user
+from security.rate_limiter import cart_limiter, checkout_limiter
 
 # models
 from models.user import BaseUser
-from models.product import Product
 from models.cart import Cart
-from models.ticket import Ticket, TypeTicket
+from models.product import PRODUCT_ID_PATTERN
+from models.ticket import Ticket, TicketItem, TypeTicket
 
 # util
 from util.verify import verify_product_id_in_shop
+from util.loader import Loader, get_loader
+from util.documents import invalidate_products
+from util.sales import record_sales
+from util.conditional import with_next_version
 
 
-db_client = MongoDB()
+db_client = AsyncMongoDB()
 
 router = APIRouter(
     prefix = "/carts"
 )
 
+
+def verify_product_key(product_id: str):
+    """
+    ``product_id`` becomes a field path of the cart (``products.<id>``);
+    products stored before IDs were restricted may not be safe there.
+    """
+    if not re.fullmatch(PRODUCT_ID_PATTERN, product_id):
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = {
+                "errmsg": "Incorrect product"
+            }
+        )
+
+
 ### PATH OPERATIONS ###
 
 ## get my cart ##
@@ -38,7 +63,7 @@ router = APIRouter(
     summary = "Get my cart"
 )
 async def get_my_cart(current_user: BaseUser = Depends(get_current_user)):
-    cart = db_client.carts_db.find_one({"user_id": current_user.id})
+    cart = await db_client.carts_db.find_one({"user_id": current_user.id})
     if not cart:
         return None
     return Cart(**cart)
@@ -50,31 +75,19 @@ async def get_my_cart(current_user: BaseUser = Depends(get_current_user)):
     status_code = status.HTTP_202_ACCEPTED,
     response_model = Cart,
     tags = ["Carts"],
-    summary = "Add a product in the cart"
+    summary = "Add a product in the cart",
+    dependencies = [Depends(cart_limiter)]
 )
 async def add_product_to_cart(
     shop_id: str = Path(...),
     product_id: str = Path(...),
-    current_user: BaseUser = Depends(get_current_user)
+    current_user: BaseUser = Depends(get_current_user),
+    loader: Loader = Depends(get_loader)
 ):
-    verify_product_id_in_shop(product_id, shop_id)
+    verify_product_key(product_id)
+    product = await verify_product_id_in_shop(product_id, shop_id, loader)
 
-    cart = db_client.carts_db.find_one(
-        {
-            "user_id": current_user.id
-        }
-    )
-    if not cart:
-        cart = Cart(
-            user_id = current_user.id
-        )
-    else:
-        cart = Cart(**cart)
-
-    product = db_client.products_db.find_one({"id": product_id})
-    product = Product(**product)
-
-    if product.stock == 0:
+    if product.get("stock", 0) == 0:
         raise HTTPException(
             status_code = status.HTTP_400_BAD_REQUEST,
             detail = {
@@ -82,27 +95,30 @@ async def add_product_to_cart(
             }
         )
     
-    cart.products.append(product.id)
-    cart.total += product.price
-    
-    # returned_product_data = db_client.products_db.update_one(
-    #     filter = {"id": product_id},
-    #     update = {"$set": {"stock": product.stock}}
-    # )
-    # if not returned_product_data.acknowledged:
-    #     raise HTTPException(
-    #         status_code = status.HTTP_409_CONFLICT,
-    #         detail = {
-    #             "errmsg": "Product was not inserted"
-    #         }
-    #     )
-    
-    returned_cart_data = db_client.carts_db.replace_one(
-        filter = {"id": cart.id},
-        replacement = cart.model_dump(),
-        upsert = True
-    )
-    if not returned_cart_data.acknowledged:
+    update = {
+        "$inc": {f'products.{product_id}.quantity': 1},
+        "$set": {
+            f'products.{product_id}.unit_price': product["price"],
+            f'products.{product_id}.shop_id': shop_id
+        },
+        "$addToSet": {"shop_ids": shop_id},
+        "$setOnInsert": {"id": str(ObjectId())}
+    }
+    try:
+        cart = await db_client.carts_db.find_one_and_update(
+            {"user_id": current_user.id},
+            update,
+            upsert = True,
+            return_document = ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # a parallel request created the cart first, now it exists
+        cart = await db_client.carts_db.find_one_and_update(
+            {"user_id": current_user.id},
+            update,
+            return_document = ReturnDocument.AFTER
+        )
+    if not cart:
         raise HTTPException(
             status_code = status.HTTP_409_CONFLICT,
             detail = {
@@ -110,30 +126,144 @@ async def add_product_to_cart(
             }
         )
 
+    cart = Cart(**cart)
+
     return cart
 
 
+## set quantity of a product ##
+@router.patch(
+    path = "/{shop_id}/{product_id}/set-quantity/{quantity}",
+    status_code = status.HTTP_202_ACCEPTED,
+    response_model = Cart,
+    tags = ["Carts"],
+    summary = "Set the quantity of a product in the cart",
+    dependencies = [Depends(cart_limiter)]
+)
+async def set_quantity_of_product(
+    shop_id: str = Path(...),
+    product_id: str = Path(...),
+    quantity: int = Path(..., ge=0),
+    current_user: BaseUser = Depends(get_current_user),
+    loader: Loader = Depends(get_loader)
+):
+    verify_product_key(product_id)
+
+    if quantity == 0:
+        cart = await db_client.carts_db.find_one_and_update(
+            {"user_id": current_user.id},
+            {"$unset": {f'products.{product_id}': ""}},
+            return_document = ReturnDocument.AFTER
+        )
+        if not cart:
+            raise HTTPException(
+                status_code = status.HTTP_400_BAD_REQUEST,
+                detail = {
+                    "errmsg": "You don't have any cart"
+                }
+            )
+        return Cart(**cart)
+
+    product = await verify_product_id_in_shop(product_id, shop_id, loader)
+
+    if product.get("stock", 0) < quantity:
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = {
+                "errmsg": "Product without enough stock"
+            }
+        )
+
+    update = {
+        "$set": {
+            f'products.{product_id}': {
+                "quantity": quantity,
+                "unit_price": product["price"],
+                "shop_id": shop_id
+            }
+        },
+        "$addToSet": {"shop_ids": shop_id},
+        "$setOnInsert": {"id": str(ObjectId())}
+    }
+    try:
+        cart = await db_client.carts_db.find_one_and_update(
+            {"user_id": current_user.id},
+            update,
+            upsert = True,
+            return_document = ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        cart = await db_client.carts_db.find_one_and_update(
+            {"user_id": current_user.id},
+            update,
+            return_document = ReturnDocument.AFTER
+        )
+    if not cart:
+        raise HTTPException(
+            status_code = status.HTTP_409_CONFLICT,
+            detail = {
+                "errmsg": "Cart was not updated"
+            }
+        )
+
+    return Cart(**cart)
+
+
+async def restore_cart(cart: dict):
+    """
+    Puts back a cart claimed by a checkout that failed before creating
+    its ticket, unless the user already started a new one.
+    """
+    try:
+        await db_client.carts_db.insert_one(cart)
+    except DuplicateKeyError:
+        pass
+
+
+async def return_stock(ticket_id: str, to_sell: dict[str, int]):
+    """
+    Gives back the units taken by a checkout that failed before its
+    ticket was created. Only the products still marked with the ticket
+    had their stock decremented.
+    """
+    await db_client.products_db.bulk_write(
+        [
+            UpdateOne(
+                {"id": product_id, "pending_checkouts": ticket_id},
+                with_next_version({"$inc": {"stock": units}})
+            )
+            for product_id, units in to_sell.items()
+        ],
+        ordered = False
+    )
+
+
 ## buy the cart ##
 @router.post(
     path = "/my/buy",
     status_code = status.HTTP_202_ACCEPTED,
     # response_model = Ticket,
     tags = ["Carts"],
-    summary = "Buy a cart"
+    summary = "Buy a cart",
+    dependencies = [Depends(checkout_limiter)]
 )
 async def buy_cart(
     current_user: BaseUser = Depends(get_current_user)
 ):
     message = f''
-    cart_to_buy = db_client.carts_db.find_one({"user_id": current_user.id})
-    if not cart_to_buy:
+    # claim the cart before touching the stock: a parallel checkout of the
+    # same cart (e.g. a double click) finds nothing to buy
+    cart_document = await db_client.carts_db.find_one_and_delete(
+        {"user_id": current_user.id}
+    )
+    if not cart_document:
         raise HTTPException(
             status_code = status.HTTP_400_BAD_REQUEST,
             detail = {
                 "errmsg": "You don't have any cart"
             }
         )
-    cart_to_buy = Cart(**cart_to_buy)
+    cart_to_buy = Cart(**cart_document)
 
     ticket = Ticket(
         type = TypeTicket.sale,
@@ -142,59 +272,127 @@ async def buy_cart(
         user_id = current_user.id
     )
     
-    for item in cart_to_buy.products:
-        product = db_client.products_db.find_one({"id": item})
-        if not product:
+    to_sell = {}
+    sold = {}
+    ticket_inserted = False
+    try:
+        quantities = {
+            product_id: item.quantity
+            for product_id, item in cart_to_buy.products.items()
+        }
+        products = await db_client.products_db.find(
+            {"id": {"$in": list(quantities)}},
+            {"id": 1, "name": 1, "stock": 1, "_id": 0}
+        )
+        products = {product["id"]: product for product in products}
+        if len(products) != len(quantities):
             raise HTTPException(
                 status_code = status.HTTP_409_CONFLICT,
                 detail = {
                     "errmsg": "Product in cart not found"
                 }
             )
-        product = Product(**product)
 
-        if product.stock == 0:
-            cart_to_buy.total -= product.price
-            message += f'"{product.id}" deleted because does not have stock, '
-            continue
-    
-        returned_product_data = db_client.products_db.update_one(
-            {
-                "id": product.id
-            },
-            {
-                "$set": {"stock": product.stock - 1}
-            }
-        )
-        if not returned_product_data.acknowledged:
+        # sell what the stock read allows; the stock filter in each update
+        # rejects the decrement if a parallel checkout got there first
+        for product_id, quantity in quantities.items():
+            units = min(quantity, products[product_id].get("stock", 0))
+            if units > 0:
+                to_sell[product_id] = units
+
+        if to_sell:
+            operations = [
+                UpdateOne(
+                    {"id": product_id, "stock": {"$gte": units}},
+                    with_next_version(
+                        {
+                            "$inc": {"stock": -units},
+                            "$push": {"pending_checkouts": ticket.id}
+                        }
+                    )
+                )
+                for product_id, units in to_sell.items()
+            ]
+            returned_product_data = await db_client.products_db.bulk_write(
+                operations,
+                ordered = False
+            )
+            if not returned_product_data.acknowledged:
+                raise HTTPException(
+                    status_code = status.HTTP_409_CONFLICT,
+                    detail = {
+                        "errmsg": "Error updating the stock of the products"
+                    }
+                )
+
+            sold = to_sell
+            if returned_product_data.matched_count < len(operations):
+                updated_products = await db_client.products_db.find(
+                    {
+                        "id": {"$in": list(to_sell)},
+                        "pending_checkouts": ticket.id
+                    },
+                    {"id": 1, "_id": 0}
+                )
+                sold = {
+                    product["id"]: to_sell[product["id"]]
+                    for product in updated_products
+                }
+
+        out_of_stock = []
+        for product_id, item in cart_to_buy.products.items():
+            units = sold.get(product_id, 0)
+
+            if units > 0:
+                ticket.items.append(
+                    TicketItem(
+                        product_id = product_id,
+                        name = products[product_id]["name"],
+                        shop_id = item.shop_id,
+                        quantity = units,
+                        unit_price = item.unit_price
+                    )
+                )
+                ticket.price += item.unit_price * units
+            if units < item.quantity:
+                message += f'"{product_id}" deleted because does not have stock, '
+                out_of_stock.append(
+                    {
+                        "product_id": product_id,
+                        "requested": item.quantity,
+                        "sold": units
+                    }
+                )
+
+        returned_ticket_data = await db_client.tickets_db.insert_one(ticket.model_dump())
+        if not returned_ticket_data:
             raise HTTPException(
                 status_code = status.HTTP_409_CONFLICT,
                 detail = {
-                    "errmsg": f'Error with the product: {product.id}'
+                    "errmsg": "Ticket was not created"
                 }
             )
-        ticket.items.append(product)
-        ticket.price += product.price
-
-    returned_ticket_data = db_client.tickets_db.insert_one(ticket.model_dump())
-    if not returned_ticket_data:
-        raise HTTPException(
-            status_code = status.HTTP_409_CONFLICT,
-            detail = {
-                "errmsg": "Ticket was not created"
-            }
-        )
+        ticket_inserted = True
 
-    returned_cart_data = db_client.carts_db.delete_one({"id": cart_to_buy.id})
-    if not returned_cart_data.acknowledged:
-        raise HTTPException(
-            status_code = status.HTTP_409_CONFLICT,
-            detail = {
-                "errmsg": "Cart was not bought"
-            }
-        )
+        await record_sales(ticket)
+    except Exception:
+        # nothing is lost before the ticket exists: the units taken go
+        # back to the products and the cart goes back to the user
+        if not ticket_inserted:
+            if to_sell:
+                await return_stock(ticket.id, to_sell)
+            await restore_cart(cart_document)
+        raise
+    finally:
+        if to_sell:
+            await db_client.products_db.update_many(
+                {"id": {"$in": list(to_sell)}},
+                {"$pull": {"pending_checkouts": ticket.id}}
+            )
+            await invalidate_products(list(to_sell))
 
     return {
         "ticket": ticket,
-        "message": message
+        "message": message,
+        "out_of_stock": out_of_stock
     }
@@ -0,0 +1,19 @@
+# FastAPI
+from fastapi import APIRouter, status
+
+# util
+from util.metrics import metrics_response
+
+
+router = APIRouter()
+
+### PATH OPERATIONS ###
+
+## prometheus metrics ##
+@router.get(
+    path = "/metrics",
+    status_code = status.HTTP_200_OK,
+    include_in_schema = False
+)
+async def get_metrics():
+    return metrics_response()
@@ -1,33 +1,133 @@
 # Python
 # from bson import ObjectId
+import re
 from typing import Union
 
 # FastAPI
-from fastapi import APIRouter, Path, Query, Body, Depends
+from fastapi import APIRouter, Path, Query, Body, Depends, Request
 from fastapi import HTTPException, status
 
+# PyMongo
+from pymongo import ReturnDocument, UpdateOne, UpdateMany
+from pymongo.errors import BulkWriteError
+
+# Pydantic
+from pydantic import ValidationError
+
 # database
-from database.mongo_client import MongoDB
+from database.mongo_client import AsyncMongoDB
 
 # security
 from security.auth import get_current_user
 
 # models
 from models.user import BaseUser
-from models.product import Product, ProductDb
+from models.product import Product, ProductDb, ProductSearchResult, ProductSuggestion
+from models.page import Page
+from models.bulk import ImportReport, RowError, ProductChange, MutationReport
 
 # util
 from util.verify import verify_shop_id, verify_product_id_in_shop, verify_owner_of_shop
+from util.loader import Loader, get_loader
+from util.pagination import paginate
+from util.projection import model_projection
+from util.responses import json_response, trusted, trusted_list
+from util.bulk_import import read_rows
+from util.documents import invalidate_products
+from util.singleflight import create_flight
+from util.shop_deletion import live_shop_filter
+from util.conditional import VERSION_FIELDS, VERSION_PROJECTION, new_version, with_next_version
+from util.conditional import is_conditional, is_not_modified, not_modified, validators, pop_versions, conditional_headers
+
 
+db_client = AsyncMongoDB()
 
-db_client = MongoDB()
+PRODUCT_PROJECTION = model_projection(ProductDb)
+PRODUCT_VERSION_PROJECTION = model_projection(ProductDb, *VERSION_FIELDS)
+SUGGESTION_PROJECTION = model_projection(ProductSuggestion)
+
+IMPORT_CHUNK_SIZE = 1000
+
+product_pages = create_flight("product_pages")
 
 router = APIRouter(
     prefix = "/products"
 )
 
+
+def product_document(product: ProductDb):
+    """
+    Document stored for ``product``: its fields plus the lowercase name
+    used by the autocomplete index and its first version.
+    """
+    document = product.model_dump()
+    document["name_lower"] = product.name.lower()
+    document.update(new_version())
+    return document
+
+
 ### PATH OPERATIONS ###
 
+## search products ##
+@router.get(
+    path = "/search",
+    status_code = status.HTTP_200_OK,
+    response_model = list[ProductSearchResult],
+    tags = ["Products"],
+    summary = "Search products by name, description and collection"
+)
+async def search_products(
+    q: str = Query(..., min_length=1),
+    shop_id: Union[str, None] = Query(default=None),
+    limit: int = Query(default=25, gt=0, le=100)
+):
+    query = {
+        "$text": {"$search": q},
+        "shop_id": await live_shop_filter(shop_id)
+    }
+
+    projection = dict(PRODUCT_PROJECTION)
+    projection["score"] = {"$meta": "textScore"}
+
+    products = await db_client.products_db.find(
+        query,
+        projection,
+        sort = [("score", {"$meta": "textScore"})],
+        limit = limit
+    )
+
+    return json_response(trusted_list(ProductSearchResult, products))
+
+
+## autocomplete product names ##
+@router.get(
+    path = "/autocomplete",
+    status_code = status.HTTP_200_OK,
+    response_model = list[ProductSuggestion],
+    tags = ["Products"],
+    summary = "Suggest products whose name starts with a prefix"
+)
+async def autocomplete_products(
+    prefix: str = Query(..., min_length=1),
+    shop_id: Union[str, None] = Query(default=None),
+    limit: int = Query(default=10, gt=0, le=25)
+):
+    # an anchored, case-sensitive regex is an index range scan on name_lower
+    query = {
+        "name_lower": {"$regex": f'^{re.escape(prefix.lower())}'},
+        "shop_id": await live_shop_filter(shop_id)
+    }
+
+    products = await db_client.products_db.find(
+        query,
+        SUGGESTION_PROJECTION,
+        sort = [("name_lower", 1)],
+        limit = limit
+    )
+
+    return json_response(trusted_list(ProductSuggestion, products))
+
+
 ## get product ##
 @router.get(
     path = "/{shop_id}/{product_id}",
@@ -37,47 +137,80 @@ router = APIRouter(
     summary = "Get a product in a shop"
 )
 async def get_product(
+    request: Request,
     shop_id: str = Path(...),
-    product_id: str = Path(...)
+    product_id: str = Path(...),
+    loader: Loader = Depends(get_loader)
 ):
-    verify_product_id_in_shop(product_id, shop_id)
+    # served from the document cache, version fields included
+    product = await verify_product_id_in_shop(product_id, shop_id, loader)
 
-    product = db_client.products_db.find_one({"id": product_id})
-    product = ProductDb(**product)
+    etag, last_modified = validators(pop_versions([product]), single=True)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(conditional_headers(etag, last_modified))
 
-    return product
+    return json_response(
+        trusted(ProductDb, product),
+        headers = conditional_headers(etag, last_modified)
+    )
 
 
 ## get products ##
 @router.get(
     path = "/{shop_id}/",
     status_code = status.HTTP_200_OK,
-    response_model = list,
+    response_model = Page,
     tags = ["Products"],
-    summary = "Get products in a shop"
+    summary = "Get a page of products in a shop"
 )
 async def get_products(
+    request: Request,
     shop_id: str = Path(...),
-    product_name: Union[str, None] = Query(default=None)
+    product_name: Union[str, None] = Query(default=None),
+    limit: int = Query(default=25, gt=0, le=100),
+    cursor: Union[str, None] = Query(default=None),
+    loader: Loader = Depends(get_loader)
 ):
-    verify_shop_id(shop_id)
-    if not product_name:
-        products = db_client.products_db.find().limit(25)
+    await verify_shop_id(shop_id, loader)
 
-        return [Product(**data) for data in products]
-    
-    products = db_client.products_db.find(
-        {"name": product_name}
+    query = {"shop_id": shop_id}
+    if product_name:
+        query["name"] = product_name
+
+    # concurrent requests for the same page share one query
+    if is_conditional(request):
+        versions, _ = await product_pages.do(
+            ("versions", shop_id, product_name, limit, cursor),
+            paginate,
+            db_client.products_db,
+            query,
+            limit = limit,
+            cursor = cursor,
+            projection = VERSION_PROJECTION
+        )
+        etag, last_modified = validators(versions)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(conditional_headers(etag, last_modified))
+
+    products, next_cursor = await product_pages.do(
+        ("products", shop_id, product_name, limit, cursor),
+        paginate,
+        db_client.products_db,
+        query,
+        limit = limit,
+        cursor = cursor,
+        projection = PRODUCT_VERSION_PROJECTION
+    )
+    products = [dict(product) for product in products]
+    etag, last_modified = validators(pop_versions(products))
+
+    return json_response(
+        {
+            "items": trusted_list(ProductDb, products),
+            "next_cursor": next_cursor
+        },
+        headers = conditional_headers(etag, last_modified)
     )
-    # if len(products) == 0:
-    #     raise HTTPException(
-    #         status_code = status.HTTP_400_BAD_REQUEST,
-    #         detail = {
-    #             "errmsg": "Products not found"
-    #         }
-    #     )
-    
-    return [ProductDb(**item) for item in products]
 
 
 ## insert product ##
@@ -91,14 +224,15 @@ async def get_products(
 async def insert_product(
     shop_id: str = Path(...),
     data: Product = Body(...),
-    current_user: BaseUser = Depends(get_current_user)
+    current_user: BaseUser = Depends(get_current_user),
+    loader: Loader = Depends(get_loader)
 ):
-    verify_owner_of_shop(shop_id, current_user.id)
+    await verify_owner_of_shop(shop_id, current_user.id, loader)
     
     product = ProductDb(**data.model_dump())
     product.shop_id = shop_id
 
-    returned_data = db_client.products_db.insert_one(product.model_dump())
+    returned_data = await db_client.products_db.insert_one(product_document(product))
     if not returned_data.acknowledged:
         raise HTTPException(
             status_code = status.HTTP_409_CONFLICT,
@@ -106,11 +240,155 @@ async def insert_product(
                 "errmsg": "Product was not inserted"
             }
         )
-    
-    product_to_return = db_client.products_db.find_one(
-        {"_id": returned_data.inserted_id}
+
+    return product
+
+
+async def insert_chunk(documents: list[dict], rows: list[int], report: ImportReport):
+    try:
+        returned_data = await db_client.products_db.insert_many(
+            documents,
+            ordered = False
+        )
+        report.inserted += len(returned_data.inserted_ids)
+    except BulkWriteError as error:
+        report.inserted += error.details["nInserted"]
+        for write_error in error.details["writeErrors"]:
+            report.errors.append(
+                RowError(
+                    row = rows[write_error["index"]],
+                    errors = [{"msg": write_error["errmsg"]}]
+                )
+            )
+
+
+## insert products in bulk ##
+@router.post(
+    path = "/register/{shop_id}/bulk",
+    status_code = status.HTTP_201_CREATED,
+    response_model = ImportReport,
+    tags = ["Products"],
+    summary = "Insert products in a shop from an NDJSON or CSV body"
+)
+async def insert_products(
+    request: Request,
+    shop_id: str = Path(...),
+    current_user: BaseUser = Depends(get_current_user),
+    loader: Loader = Depends(get_loader)
+):
+    await verify_owner_of_shop(shop_id, current_user.id, loader)
+
+    report = ImportReport()
+    documents = []
+    rows = []
+    async for row_number, row, error in read_rows(request):
+        if error:
+            report.errors.append(
+                RowError(row=row_number, errors=[{"msg": error}])
+            )
+            continue
+
+        try:
+            product = ProductDb(**Product(**row).model_dump())
+        except ValidationError as validation_error:
+            report.errors.append(
+                RowError(
+                    row = row_number,
+                    errors = [
+                        {"loc": list(item["loc"]), "msg": item["msg"]}
+                        for item in validation_error.errors()
+                    ]
+                )
+            )
+            continue
+
+        product.shop_id = shop_id
+        documents.append(product_document(product))
+        rows.append(row_number)
+
+        if len(documents) == IMPORT_CHUNK_SIZE:
+            await insert_chunk(documents, rows, report)
+            documents = []
+            rows = []
+
+    if documents:
+        await insert_chunk(documents, rows, report)
+
+    return report
+
+
+def change_operation(shop_id: str, change: ProductChange):
+    query = {"shop_id": shop_id}
+    if change.product_id is not None:
+        query["id"] = change.product_id
+    else:
+        query["collection"] = change.collection
+
+    update = with_next_version({})
+    if change.set_stock is not None:
+        update["$set"]["stock"] = change.set_stock
+    if change.adjust_stock is not None:
+        update["$inc"]["stock"] = change.adjust_stock
+        if change.adjust_stock < 0:
+            # never take the stock below zero
+            query["stock"] = {"$gte": -change.adjust_stock}
+    if change.set_price is not None:
+        update["$set"]["price"] = change.set_price
+
+    if change.product_id is not None:
+        return UpdateOne(query, update)
+    return UpdateMany(query, update)
+
+
+async def changed_product_ids(shop_id: str, changes: list[ProductChange]):
+    """
+    IDs of the products ``changes`` may touch, to drop them from the
+    document cache.
+    """
+    ids = [change.product_id for change in changes if change.product_id is not None]
+    collections = {change.collection for change in changes if change.product_id is None}
+    if collections:
+        products = await db_client.products_db.find(
+            {"shop_id": shop_id, "collection": {"$in": list(collections)}},
+            {"id": 1, "_id": 0}
+        )
+        ids.extend(product["id"] for product in products)
+    return ids
+
+
+## update products in bulk ##
+@router.patch(
+    path = "/{shop_id}/bulk",
+    status_code = status.HTTP_200_OK,
+    response_model = MutationReport,
+    tags = ["Products"],
+    summary = "Update stock and price of many products in a shop"
+)
+async def update_products(
+    shop_id: str = Path(...),
+    changes: list[ProductChange] = Body(..., min_length=1, max_length=10000),
+    current_user: BaseUser = Depends(get_current_user),
+    loader: Loader = Depends(get_loader)
+):
+    await verify_owner_of_shop(shop_id, current_user.id, loader)
+
+    returned_data = await db_client.products_db.bulk_write(
+        [change_operation(shop_id, change) for change in changes],
+        ordered = False
+    )
+    if not returned_data.acknowledged:
+        raise HTTPException(
+            status_code = status.HTTP_409_CONFLICT,
+            detail = {
+                "errmsg": "Products were not updated"
+            }
+        )
+    await invalidate_products(await changed_product_ids(shop_id, changes))
+
+    return MutationReport(
+        matched = returned_data.matched_count,
+        modified = returned_data.modified_count
     )
-    return ProductDb(**product_to_return)
 
 
 ## update stock of product ##
@@ -125,22 +403,25 @@ async def set_stock_of_product(
     shop_id: str = Path(...),
     product_id: str = Path(...),
     stock: int = Path(..., gt=0),
-    current_user: BaseUser = Depends(get_current_user)
+    current_user: BaseUser = Depends(get_current_user),
+    loader: Loader = Depends(get_loader)
 ):
-    verify_product_id_in_shop(product_id, shop_id)
-    verify_owner_of_shop(shop_id, current_user.id)
+    await verify_product_id_in_shop(product_id, shop_id, loader)
+    await verify_owner_of_shop(shop_id, current_user.id, loader)
 
-    returned_data = db_client.products_db.update_one(
-        {"id": product_id},
-        {"$set": {"stock": stock}}
+    product = await db_client.products_db.find_one_and_update(
+        {"id": product_id, "shop_id": shop_id},
+        with_next_version({"$set": {"stock": stock}}),
+        projection = PRODUCT_PROJECTION,
+        return_document = ReturnDocument.AFTER
     )
-    if not returned_data.acknowledged:
+    if not product:
         raise HTTPException(
             status_code = status.HTTP_409_CONFLICT,
             detail = {
                 "errmsg": "Product was not updated"
             }
         )
+    await invalidate_products([product_id])
 
-    product_to_return = db_client.products_db.find_one({"id": product_id})
-    return ProductDb(**product_to_return)
+    return json_response(trusted(ProductDb, product))
@@ -1,12 +1,13 @@
 # Python
+from datetime import date, datetime, timedelta
 from typing import Union
 
 # FastAPI
-from fastapi import APIRouter, Path, Query, Body, Depends
+from fastapi import APIRouter, Path, Query, Body, Depends, BackgroundTasks, Request
 from fastapi import HTTPException, status
 
 # database
-from database.mongo_client import MongoDB
+from database.mongo_client import AsyncMongoDB
 
 # security
 from security.auth import get_current_user
@@ -14,13 +15,37 @@ from security.auth import get_current_user
 # models
 from models.user import BaseUser
 from models.shop import BaseShop, Shop
+from models.product import ProductDb
+from models.ticket import Ticket
+from models.job import Job, TypeJob
+from models.sales import SalesReport
+from models.page import Page
 
 # util
-from util.verify import verify_shop_name, verify_shop_id
-from util.white_lists import get_white_list_shop_names
+from util.verify import verify_shop_name, verify_shop_id, verify_owner_of_shop
+from util.loader import Loader, get_loader
+from util.exists import exist_shop_name
+from util.pagination import paginate
+from util.projection import model_projection
+from util.responses import json_response, trusted, trusted_list
+from util.export import ExportFormat, export_response
+from util.shop_deletion import delete_shop_products
+from util.documents import invalidate_shop
+from util.tickets import shop_ticket
+from util.sales import sales_report
+from util.conditional import VERSION_FIELDS, VERSION_PROJECTION, new_version, with_next_version
+from util.conditional import is_conditional, is_not_modified, not_modified, validators, pop_versions, conditional_headers
 
 
-db_client = MongoDB()
+db_client = AsyncMongoDB()
+
+SHOP_PROJECTION = model_projection(Shop)
+SHOP_VERSION_PROJECTION = model_projection(Shop, *VERSION_FIELDS)
+PRODUCT_PROJECTION = model_projection(ProductDb)
+TICKET_PROJECTION = model_projection(Ticket)
+JOB_PROJECTION = model_projection(Job)
+
+EXPORT_BATCH_SIZE = 1000
 
 router = APIRouter(
     prefix = "/shops"
@@ -37,38 +62,78 @@ router = APIRouter(
     summary = "Get a shop by ID"
 )
 async def get_shop(
-    id: str = Path(...)
+    request: Request,
+    id: str = Path(...),
+    loader: Loader = Depends(get_loader)
 ):
-    verify_shop_id(id)
+    # served from the document cache, version fields included
+    shop = await verify_shop_id(id, loader)
+    shop.pop("deleted", None)
 
-    shop = db_client.shops_db.find_one({"id": id})
-    shop = Shop(**shop)
+    etag, last_modified = validators(pop_versions([shop]), single=True)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(conditional_headers(etag, last_modified))
 
-    return shop
+    return json_response(
+        trusted(Shop, shop),
+        headers = conditional_headers(etag, last_modified)
+    )
 
 
 ## get shops or a shop by name ##
 @router.get(
     path = "/",
     status_code = status.HTTP_200_OK,
-    response_model = Union[Shop, list],
+    response_model = Union[Shop, Page],
     tags = ["Shops"],
-    summary = "Get a shop or shops"
+    summary = "Get a shop or a page of shops"
 )
 async def get_shops(
-    name: Union[str, None] = Query(default=None)
+    request: Request,
+    name: Union[str, None] = Query(default=None),
+    limit: int = Query(default=25, gt=0, le=100),
+    cursor: Union[str, None] = Query(default=None)
 ):
     if not name:
-        shops = db_client.shops_db.find().limit(25)
-        return [Shop(**shop) for shop in shops]
+        query = {"deleted": {"$ne": True}}
 
-    verify_shop_name(name)
-    
-    shop = db_client.shops_db.find_one({"name": name})
-    if not shop:
-        return None
+        if is_conditional(request):
+            versions, _ = await paginate(
+                db_client.shops_db,
+                query,
+                limit = limit,
+                cursor = cursor,
+                projection = VERSION_PROJECTION
+            )
+            etag, last_modified = validators(versions)
+            if is_not_modified(request, etag, last_modified):
+                return not_modified(conditional_headers(etag, last_modified))
+
+        shops, next_cursor = await paginate(
+            db_client.shops_db,
+            query,
+            limit = limit,
+            cursor = cursor,
+            projection = SHOP_VERSION_PROJECTION
+        )
+        etag, last_modified = validators(pop_versions(shops))
+
+        return json_response(
+            {
+                "items": trusted_list(Shop, shops),
+                "next_cursor": next_cursor
+            },
+            headers = conditional_headers(etag, last_modified)
+        )
+
+    await verify_shop_name(name)
     
-    return Shop(**shop)
+    shop = await db_client.shops_db.find_one(
+        {"name": name, "deleted": {"$ne": True}},
+        SHOP_PROJECTION
+    )
+
+    return json_response(trusted(Shop, shop))
 
 
 ## insert a shop ##
@@ -83,7 +148,7 @@ async def insert_shop(
     data: BaseShop = Body(...),
     current_user: BaseUser = Depends(get_current_user)
 ):
-    if data.name.lower() in get_white_list_shop_names():
+    if await exist_shop_name(data.name):
         raise HTTPException(
             status_code = status.HTTP_400_BAD_REQUEST,
             detail = {
@@ -95,7 +160,9 @@ async def insert_shop(
     shop.owner_id = current_user.id
     shop.name = data.name.lower()
     
-    returned_data = db_client.shops_db.insert_one(shop.model_dump())
+    returned_data = await db_client.shops_db.insert_one(
+        {**shop.model_dump(), **new_version()}
+    )
     if not returned_data.acknowledged:
         raise HTTPException(
             status_code = status.HTTP_409_CONFLICT,
@@ -103,9 +170,8 @@ async def insert_shop(
                 "errmsg": "Shop not inserted"
             }
         )
-    
-    shop_to_return = db_client.shops_db.find_one({"_id": returned_data.inserted_id})
-    return Shop(**shop_to_return)
+
+    return shop
 
 
 ## delete a shop ##
@@ -117,12 +183,12 @@ async def insert_shop(
     summary = "Delete my shop"
 )
 async def delete_shop(
+    background_tasks: BackgroundTasks,
     id: str = Path(...),
-    current_user: BaseUser = Depends(get_current_user)
+    current_user: BaseUser = Depends(get_current_user),
+    loader: Loader = Depends(get_loader)
 ):
-    verify_shop_id(id)
-
-    owner_shop = db_client.shops_db.find_one({"id": id}, {"owner_id": 1})
+    owner_shop = await verify_shop_id(id, loader)
 
     if not owner_shop["owner_id"] == current_user.id:
         raise HTTPException(
@@ -132,9 +198,14 @@ async def delete_shop(
             }
         )
     
-    ### TODO: eliminar los productos asociados a la tienda
-
-    returned_data = db_client.shops_db.delete_one({"id": id})
+    # the shop disappears now; its products and cart lines are removed
+    # in batches by a background job
+    returned_data = await db_client.shops_db.update_one(
+        {"id": id},
+        with_next_version(
+            {"$set": {"deleted": True, "deleted_at": datetime.utcnow()}}
+        )
+    )
     if not returned_data.acknowledged:
         raise HTTPException(
             status_code = status.HTTP_409_CONFLICT,
@@ -142,5 +213,141 @@ async def delete_shop(
                 "errmsg": "Shop was not deleted"
             }
         )
+    await invalidate_shop(id)
+
+    job = Job(
+        type = TypeJob.delete_shop,
+        shop_id = id,
+        owner_id = current_user.id
+    )
+    await db_client.jobs_db.insert_one(job.model_dump())
+    background_tasks.add_task(delete_shop_products, job.id, id)
     
     return True
+
+
+## progress of the deletion of my shop ##
+@router.get(
+    path = "/{id}/deletion",
+    status_code = status.HTTP_200_OK,
+    response_model = Job,
+    tags = ["Shops"],
+    summary = "Get the progress of the deletion of my shop"
+)
+async def get_shop_deletion(
+    id: str = Path(...),
+    current_user: BaseUser = Depends(get_current_user)
+):
+    jobs = await db_client.jobs_db.find(
+        {"shop_id": id, "type": TypeJob.delete_shop},
+        JOB_PROJECTION,
+        sort = [("created", -1)],
+        limit = 1
+    )
+    if not jobs or jobs[0]["owner_id"] != current_user.id:
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = {
+                "errmsg": "Incorrect shop ID"
+            }
+        )
+
+    return json_response(trusted(Job, jobs[0]))
+
+
+## export the products of my shop ##
+@router.get(
+    path = "/{id}/export/products",
+    status_code = status.HTTP_200_OK,
+    tags = ["Shops"],
+    summary = "Export the catalog of my shop as NDJSON or CSV"
+)
+async def export_products(
+    id: str = Path(...),
+    format: ExportFormat = Query(default=ExportFormat.ndjson),
+    current_user: BaseUser = Depends(get_current_user),
+    loader: Loader = Depends(get_loader)
+):
+    await verify_owner_of_shop(id, current_user.id, loader)
+
+    batches = db_client.products_db.find_batches(
+        {"shop_id": id},
+        PRODUCT_PROJECTION,
+        sort = [("id", 1)],
+        batch_size = EXPORT_BATCH_SIZE
+    )
+
+    return export_response(
+        batches,
+        format,
+        fields = list(ProductDb.model_fields),
+        filename = f'{id}-products'
+    )
+
+
+async def shop_ticket_batches(shop_id: str):
+    """
+    Tickets with lines of ``shop_id``, reduced to those lines.
+    """
+    batches = db_client.tickets_db.find_batches(
+        {"items.shop_id": shop_id},
+        TICKET_PROJECTION,
+        sort = [("release_date", 1)],
+        batch_size = EXPORT_BATCH_SIZE
+    )
+    async for batch in batches:
+        yield [shop_ticket(ticket, shop_id) for ticket in batch]
+
+
+## export the tickets of my shop ##
+@router.get(
+    path = "/{id}/export/tickets",
+    status_code = status.HTTP_200_OK,
+    tags = ["Shops"],
+    summary = "Export the sales of my shop as NDJSON or CSV"
+)
+async def export_tickets(
+    id: str = Path(...),
+    format: ExportFormat = Query(default=ExportFormat.ndjson),
+    current_user: BaseUser = Depends(get_current_user),
+    loader: Loader = Depends(get_loader)
+):
+    await verify_owner_of_shop(id, current_user.id, loader)
+
+    return export_response(
+        shop_ticket_batches(id),
+        format,
+        fields = list(Ticket.model_fields),
+        filename = f'{id}-tickets'
+    )
+
+
+## sales report of my shop ##
+@router.get(
+    path = "/{id}/sales",
+    status_code = status.HTTP_200_OK,
+    response_model = SalesReport,
+    tags = ["Shops"],
+    summary = "Get the daily sales and top products of my shop"
+)
+async def get_shop_sales(
+    id: str = Path(...),
+    start: Union[date, None] = Query(default=None),
+    end: Union[date, None] = Query(default=None),
+    top: int = Query(default=5, gt=0, le=50),
+    current_user: BaseUser = Depends(get_current_user),
+    loader: Loader = Depends(get_loader)
+):
+    await verify_owner_of_shop(id, current_user.id, loader)
+
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    if start > end or (end - start).days > 366:
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = {
+                "errmsg": "The range must go forward and span at most a year"
+            }
+        )
+
+    return await sales_report(id, start, end, top)
@@ -0,0 +1,63 @@
+# FastAPI
+from fastapi import APIRouter, Depends
+from fastapi import HTTPException, status
+
+# security
+from security.auth import get_current_user
+
+# models
+from models.user import User
+
+# util
+from util.cache import caches
+from util.singleflight import flights
+
+
+router = APIRouter(
+    prefix = "/stats"
+)
+
+### PATH OPERATIONS ###
+
+## cache counters ##
+@router.get(
+    path = "/caches",
+    status_code = status.HTTP_200_OK,
+    response_model = dict,
+    tags = ["Stats"],
+    summary = "Get hit/miss counters of the caches"
+)
+async def get_cache_stats(
+    current_user: User = Depends(get_current_user)
+):
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code = status.HTTP_401_UNAUTHORIZED,
+            detail = {
+                "errmsg": "Only superusers can read stats"
+            }
+        )
+
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+## coalesced reads counters ##
+@router.get(
+    path = "/flights",
+    status_code = status.HTTP_200_OK,
+    response_model = dict,
+    tags = ["Stats"],
+    summary = "Get how many reads were shared by concurrent requests"
+)
+async def get_flight_stats(
+    current_user: User = Depends(get_current_user)
+):
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code = status.HTTP_401_UNAUTHORIZED,
+            detail = {
+                "errmsg": "Only superusers can read stats"
+            }
+        )
+
+    return {name: flight.stats() for name, flight in flights.items()}
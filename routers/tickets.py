@@ -0,0 +1,104 @@
+# Python
+from typing import Union
+
+# FastAPI
+from fastapi import APIRouter, Path, Query, Depends
+from fastapi import status
+
+# PyMongo
+from pymongo import DESCENDING
+
+# database
+from database.mongo_client import AsyncMongoDB
+
+# security
+from security.auth import get_current_user
+
+# models
+from models.user import BaseUser
+from models.ticket import Ticket
+from models.page import Page
+
+# util
+from util.verify import verify_owner_of_shop
+from util.loader import Loader, get_loader
+from util.pagination import paginate
+from util.projection import model_projection
+from util.responses import json_response, trusted_list
+from util.tickets import shop_ticket
+
+
+db_client = AsyncMongoDB()
+
+TICKET_PROJECTION = model_projection(Ticket)
+TICKET_SORT = [("release_date", DESCENDING), ("id", DESCENDING)]
+
+router = APIRouter(
+    prefix = "/tickets"
+)
+
+### PATH OPERATIONS ###
+
+## get my purchases ##
+@router.get(
+    path = "/my",
+    status_code = status.HTTP_200_OK,
+    response_model = Page,
+    tags = ["Tickets"],
+    summary = "Get a page of my purchases, newest first"
+)
+async def get_my_tickets(
+    limit: int = Query(default=25, gt=0, le=100),
+    cursor: Union[str, None] = Query(default=None),
+    current_user: BaseUser = Depends(get_current_user)
+):
+    tickets, next_cursor = await paginate(
+        db_client.tickets_db,
+        {"user_id": current_user.id},
+        limit = limit,
+        cursor = cursor,
+        sort = TICKET_SORT,
+        projection = TICKET_PROJECTION
+    )
+
+    return json_response(
+        {
+            "items": trusted_list(Ticket, tickets),
+            "next_cursor": next_cursor
+        }
+    )
+
+
+## get the sales of my shop ##
+@router.get(
+    path = "/shop/{shop_id}",
+    status_code = status.HTTP_200_OK,
+    response_model = Page,
+    tags = ["Tickets"],
+    summary = "Get a page of the sales of my shop, newest first"
+)
+async def get_shop_tickets(
+    shop_id: str = Path(...),
+    limit: int = Query(default=25, gt=0, le=100),
+    cursor: Union[str, None] = Query(default=None),
+    current_user: BaseUser = Depends(get_current_user),
+    loader: Loader = Depends(get_loader)
+):
+    await verify_owner_of_shop(shop_id, current_user.id, loader)
+
+    tickets, next_cursor = await paginate(
+        db_client.tickets_db,
+        {"items.shop_id": shop_id},
+        limit = limit,
+        cursor = cursor,
+        sort = TICKET_SORT,
+        projection = TICKET_PROJECTION
+    )
+    tickets = [shop_ticket(ticket, shop_id) for ticket in tickets]
+
+    return json_response(
+        {
+            "items": trusted_list(Ticket, tickets),
+            "next_cursor": next_cursor
+        }
+    )
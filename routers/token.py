@@ -4,6 +4,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 
 # security
 from security.auth import create_access_token, authenticate_user
+from security.rate_limiter import login_limiter
 
 # models
 from models.token import Token
@@ -24,12 +25,13 @@ router = APIRouter(
     status_code = status.HTTP_202_ACCEPTED,
     response_model = Token,
     summary = "Login a user",
-    tags = ["Token"]
+    tags = ["Token"],
+    dependencies = [Depends(login_limiter)]
 )
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
-    user = authenticate_user(form_data.username, form_data.password)
+    user = await authenticate_user(form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -4,29 +4,38 @@ from typing import Union
 # FastAPI
 from fastapi import APIRouter, Path, Query, Body, Depends
 from fastapi import HTTPException, status
-from fastapi_limiter.depends import RateLimiter
+
+# PyMongo
+from pymongo import ReturnDocument
 
 # database
-from database.mongo_client import MongoDB
+from database.mongo_client import AsyncMongoDB
 
 # security
-from security.auth import get_password_hash, get_current_user
+from security.auth import get_password_hash, get_current_user, user_cache
+from security.rate_limiter import register_limiter
 
 # models
 from models.user import BaseUser, User, UserDb
+from models.page import Page
 
 # util
 from util.verify import verify_username, verify_user_id
-from util.white_lists import get_white_list_usernames
+from util.loader import Loader, get_loader
+from util.exists import exist_username
+from util.pagination import paginate
+from util.projection import model_projection
+from util.responses import json_response, trusted, trusted_list
+
 
+db_client = AsyncMongoDB()
 
-db_client = MongoDB()
+# never drop this projection: it keeps the password hash out of responses
+USER_PROJECTION = model_projection(User)
+BASE_USER_PROJECTION = model_projection(BaseUser)
 
 router = APIRouter(
-    prefix = "/users",
-    # dependencies = [
-    #     Depends(RateLimiter(times=2, seconds=5))
-    # ]
+    prefix = "/users"
 )
 
 
@@ -41,45 +50,48 @@ router = APIRouter(
     summary = "Get a user by ID"
 )
 async def get_user(
-    id: str = Path(...)
+    id: str = Path(...),
+    loader: Loader = Depends(get_loader)
 ):
-    verify_user_id(id)
-
-    user = db_client.users_db.find_one({"id": id})
-    if not user:
-        return None
-    
-    user = User(**user)
+    user = await verify_user_id(id, loader)
 
-    return user
+    return json_response(trusted(User, user))
 
 
 ## get users or a user by username
 @router.get(
     path = "/",
     status_code = status.HTTP_200_OK,
-    response_model = Union[User, list],
+    response_model = Union[User, Page],
     tags = ["Users"],
-    summary = "Get a user or users"
+    summary = "Get a user or a page of users"
 )
 async def get_users(
-    username: Union[str, None] = Query(default=None)
+    username: Union[str, None] = Query(default=None),
+    limit: int = Query(default=25, gt=0, le=100),
+    cursor: Union[str, None] = Query(default=None)
 ):
     if not username:
-        users = db_client.users_db.find().limit(25)
-        users = [User(**user) for user in users]
+        users, next_cursor = await paginate(
+            db_client.users_db,
+            {},
+            limit = limit,
+            cursor = cursor,
+            projection = USER_PROJECTION
+        )
 
-        return users
+        return json_response(
+            {
+                "items": trusted_list(User, users),
+                "next_cursor": next_cursor
+            }
+        )
     
-    verify_username(username)
+    await verify_username(username)
 
-    user = db_client.users_db.find_one({"username": username})
-    if not user:
-        return None
-    
-    user = User(**user)
+    user = await db_client.users_db.find_one({"username": username}, USER_PROJECTION)
 
-    return user
+    return json_response(trusted(User, user))
 
 
 ## get my info ##
@@ -102,12 +114,13 @@ async def read_users_me(
     status_code = status.HTTP_201_CREATED,
     response_model = User,
     tags = ["Users"],
-    summary = "Insert a user"
+    summary = "Insert a user",
+    dependencies = [Depends(register_limiter)]
 )
 async def create_user(
     data: UserDb = Body(...)
 ):  
-    if data.username in get_white_list_usernames():
+    if await exist_username(data.username):
         raise HTTPException(
             status_code = status.HTTP_409_CONFLICT,
             detail = {
@@ -115,8 +128,8 @@ async def create_user(
             }
         )
     
-    data.password = get_password_hash(data.password)
-    returned_data = db_client.users_db.insert_one(data.model_dump())
+    data.password = await get_password_hash(data.password)
+    returned_data = await db_client.users_db.insert_one(data.model_dump())
     if not returned_data.acknowledged:
         raise HTTPException(
             status_code = status.HTTP_409_CONFLICT,
@@ -124,11 +137,8 @@ async def create_user(
                 "errmsg": "User not inserted"
             }
         )
-    
-    inserted_user = db_client.users_db.find_one({"id": data.id})
-    inserted_user = User(**inserted_user)
 
-    return inserted_user
+    return User(**data.model_dump())
 
 
 ## get my info ##
@@ -142,21 +152,19 @@ async def create_user(
 async def delete_user(
     current_user: BaseUser = Depends(get_current_user)
 ):
-    verify_user_id(current_user.id)
-
-    returned_data = db_client.users_db.update_one(
+    deleted_user = await db_client.users_db.find_one_and_update(
         filter = {"id": current_user.id},
-        update = {"$set": {"disabled": True}}
+        update = {"$set": {"disabled": True}},
+        projection = BASE_USER_PROJECTION,
+        return_document = ReturnDocument.AFTER
     )
-    if not returned_data.acknowledged:
+    if not deleted_user:
         raise HTTPException(
             status_code = status.HTTP_409_CONFLICT,
             detail = {
                 "errmsg": "User not deleted"
             }
         )
-    
-    deleted_user = db_client.users_db.find_one({"id": current_user.id})
-    deleted_user = BaseUser(**deleted_user)
+    await user_cache.delete(current_user.username)
 
-    return deleted_user
+    return BaseUser(**deleted_user)
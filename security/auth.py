@@ -1,5 +1,9 @@
 # Python
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
+from threading import BoundedSemaphore
 from typing import Union
 
 # FastAPI
@@ -16,8 +20,11 @@ from jose import JWTError, jwt
 # security
 from security.config import settings
 
+# util
+from util.cache import create_cache
+
 # db
-from database.mongo_client import MongoDB
+from database.mongo_client import AsyncMongoDB
 
 # models
 from models.user import User, UserDb
@@ -34,22 +41,60 @@ pwd_context = CryptContext(
     deprecated = "auto"
     )
 
-db_client = MongoDB()
+# bcrypt releases the GIL, so a thread pool hashes on several cores at once
+password_executor = ThreadPoolExecutor(
+    max_workers = settings.password_hash_workers,
+    thread_name_prefix = "password"
+)
+password_slots = BoundedSemaphore(
+    settings.password_hash_workers + settings.password_hash_queue_limit
+)
+
+db_client = AsyncMongoDB()
+
+user_cache = create_cache(
+    "users",
+    maxsize = settings.user_cache_maxsize,
+    ttl = settings.user_cache_ttl
+)
+
+
+async def run_password_task(function, *args):
+    """
+    Runs a bcrypt operation in the password pool. Rejects with 503 when the
+    pool and its queue are full instead of piling up work.
+    """
+    if not password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code = status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers = {"Retry-After": "1"},
+            detail = {
+                "errmsg": "Too many login attempts in progress, try again later"
+            }
+        )
 
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            password_executor,
+            partial(function, *args)
+        )
+    finally:
+        password_slots.release()
 
-def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str):
+    return await run_password_task(pwd_context.verify, plain_password, hashed_password)
 
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
+async def get_password_hash(password: str):
+    return await run_password_task(pwd_context.hash, password)
 
-def authenticate_user(username: str, password: str):
-    user = db_client.users_db.find_one({"username": username})
+async def authenticate_user(username: str, password: str):
+    user = await db_client.users_db.find_one({"username": username})
     if not user:
         return False
     user = UserDb(**user)
     
-    if not verify_password(password, user.password):
+    if not await verify_password(password, user.password):
         return False
 
     return User(**user.model_dump())
@@ -91,11 +136,15 @@ async def get_current_user(token = Depends(oauth2_scheme)):
     # if not db_client.exist_user(token_data.username):
     #     raise credentials_exception
     
-    user = db_client.users_db.find_one(
-        {"username": token_data.username}
-    )
-    if not user:
-        raise credentials_exception
+    user = await user_cache.get(token_data.username)
+    if user is None:
+        user = await db_client.users_db.find_one(
+            {"username": token_data.username}
+        )
+        if not user:
+            raise credentials_exception
+        user = User(**user).model_dump()
+        await user_cache.set(token_data.username, user)
     user = User(**user)
     
     if user.disabled:
@@ -1,3 +1,7 @@
+# Python
+from typing import Union
+
+# Pydantic
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,9 +13,33 @@ class Settings(BaseSettings):
     mongodb_user: str
     mongodb_password: str
     mongodb_host: str
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 0
+    mongodb_max_idle_time_ms: Union[int, None] = None
+    mongodb_connect_timeout_ms: int = 20000
+    mongodb_server_selection_timeout_ms: int = 30000
+    mongodb_socket_timeout_ms: Union[int, None] = None
+    mongodb_executor_workers: int = 32
+    password_hash_workers: int = 4
+    password_hash_queue_limit: int = 64
+    cache_redis_url: Union[str, None] = None
+    user_cache_maxsize: int = 10000
+    user_cache_ttl: float = 30
+    document_cache_maxsize: int = 50000
+    document_cache_ttl: float = 10
+    shop_deletion_batch_size: int = 1000
+    shop_deletion_pause: float = 0.1
+    shop_deletion_stale_after: float = 300
+    shop_deletion_max_attempts: int = 5
     redis_limiter_host: str
     redis_limiter_port: str
     redis_limiter_password: str
+    redis_limiter_max_connections: int = 20
+    rate_limit_sync_interval: float = 1
+    rate_limit_login: str = "30/60"
+    rate_limit_register: str = "10/60"
+    rate_limit_cart: str = "60/60"
+    rate_limit_checkout: str = "10/60"
     password_for_testing: str
 
     model_config = SettingsConfigDict(env_file=".env")
@@ -1,7 +1,177 @@
-from fastapi_limiter import FastAPILimiter
+# Python
+import asyncio
+from time import monotonic, time
+from typing import Union
 
-# limiter = FastAPILimiter(
-#     key_func = lambda request: request.client.host,
-#     default_limits = ["5 per minute"]
-# )
-limiter = FastAPILimiter()
\ No newline at end of file
+# FastAPI
+from fastapi import Depends, HTTPException, Request, status
+
+# Redis
+from redis import asyncio as aioredis
+
+# security
+from security.config import settings
+from security.auth import get_current_user
+
+# models
+from models.user import User
+
+
+redis_client: Union[aioredis.Redis, None] = None
+
+
+async def init_redis():
+    global redis_client
+    pool = aioredis.ConnectionPool(
+        host = settings.redis_limiter_host,
+        port = int(settings.redis_limiter_port),
+        password = settings.redis_limiter_password,
+        max_connections = settings.redis_limiter_max_connections
+    )
+    redis_client = aioredis.Redis(connection_pool=pool)
+
+
+async def close_redis():
+    global redis_client
+    if redis_client is not None:
+        await redis_client.close(close_connection_pool=True)
+        redis_client = None
+
+
+def parse_limit(limit: str):
+    """
+    "5/60" -> 5 requests every 60 seconds.
+    """
+    times, seconds = limit.split("/")
+    return int(times), float(seconds)
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated", "pending", "blocked_until")
+
+    def __init__(self, capacity: int, now: float):
+        self.tokens = float(capacity)
+        self.updated = now
+        self.pending = 0
+        self.blocked_until = 0.0
+
+
+class RateLimiter:
+    """
+    Token bucket per key kept in the worker, so most decisions don't leave
+    the process. Every ``rate_limit_sync_interval`` seconds the requests
+    counted locally are added to a shared per-window counter in Redis; a
+    key over the limit across all workers is blocked until the window ends.
+    Use it as a dependency; it limits by client address.
+    """
+
+    def __init__(self, name: str, limit: str):
+        self.name = name
+        self.times, self.seconds = parse_limit(limit)
+        self.rate = self.times / self.seconds
+        self.buckets: dict[str, TokenBucket] = {}
+        self.last_sync = monotonic()
+        self.sync_task = None
+
+    def hit(self, key: str):
+        """
+        Counts a request of ``key``. Returns 0 if it is allowed, otherwise
+        the seconds to wait before retrying.
+        """
+        now = monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(self.times, now)
+
+        if bucket.blocked_until > now:
+            return bucket.blocked_until - now
+
+        bucket.tokens = min(
+            self.times,
+            bucket.tokens + (now - bucket.updated) * self.rate
+        )
+        bucket.updated = now
+        if bucket.tokens < 1:
+            return (1 - bucket.tokens) / self.rate
+
+        bucket.tokens -= 1
+        bucket.pending += 1
+
+        if (
+            redis_client is not None
+            and now - self.last_sync >= settings.rate_limit_sync_interval
+            and (self.sync_task is None or self.sync_task.done())
+        ):
+            self.last_sync = now
+            self.sync_task = asyncio.create_task(self.sync())
+
+        return 0
+
+    async def sync(self):
+        pending = {}
+        for key, bucket in self.buckets.items():
+            if bucket.pending:
+                pending[key] = bucket.pending
+                bucket.pending = 0
+        self.evict_idle()
+        if not pending:
+            return
+
+        window = int(time() // self.seconds)
+        window_end = (window + 1) * self.seconds
+        try:
+            async with redis_client.pipeline(transaction=False) as pipeline:
+                for key, count in pending.items():
+                    redis_key = f'rate_limit:{self.name}:{key}:{window}'
+                    pipeline.incrby(redis_key, count)
+                    pipeline.expire(redis_key, int(self.seconds) + 1)
+                results = await pipeline.execute()
+        except aioredis.RedisError:
+            # Redis is down: keep limiting with the local buckets only
+            return
+
+        now = monotonic()
+        for key, total in zip(pending, results[::2]):
+            bucket = self.buckets.get(key)
+            if bucket is not None and total >= self.times:
+                bucket.blocked_until = now + window_end - time()
+
+    def evict_idle(self):
+        now = monotonic()
+        idle = [
+            key for key, bucket in self.buckets.items()
+            if not bucket.pending
+            and bucket.blocked_until <= now
+            and now - bucket.updated >= self.seconds
+        ]
+        for key in idle:
+            del self.buckets[key]
+
+    def check(self, key: str):
+        retry_after = self.hit(key)
+        if retry_after:
+            raise HTTPException(
+                status_code = status.HTTP_429_TOO_MANY_REQUESTS,
+                headers = {"Retry-After": str(int(retry_after) + 1)},
+                detail = {
+                    "errmsg": "Too many requests"
+                }
+            )
+
+    async def __call__(self, request: Request):
+        self.check(request.client.host if request.client else "unknown")
+
+
+class UserRateLimiter(RateLimiter):
+    """
+    RateLimiter keyed by the authenticated user instead of the address.
+    """
+
+    async def __call__(self, current_user: User = Depends(get_current_user)):
+        self.check(current_user.id)
+
+
+login_limiter = RateLimiter("login", settings.rate_limit_login)
+register_limiter = RateLimiter("register", settings.rate_limit_register)
+cart_limiter = UserRateLimiter("cart", settings.rate_limit_cart)
+checkout_limiter = UserRateLimiter("checkout", settings.rate_limit_checkout)
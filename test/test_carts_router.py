@@ -86,6 +86,35 @@ class TestCartsRouter:
         assert response.status_code == 400
         assert response.json()["detail"]["errmsg"] == "Incorrect product"
 
+    def test_set_quantity_of_valid_product(self):
+        """
+        Verifica que se actualiza la cantidad del producto en el carrito.   
+        - Test: routers > carts.py > set_quantity_of_product()
+        - Path: carts/{shop_id}/{product_id}/set-quantity/{quantity}
+        - Method: PATCH
+        - Path param:
+            - shop_id: <shop's ID>
+            - product_id: <product's ID>
+            - quantity: <new quantity>
+        - Header param:
+            - Authorization: Bearer <access_token>
+        """
+        authorization_param = {
+            "Authorization": f'Bearer {get_access_token()}'
+        }
+        response = client.patch(
+            url = f'carts/{new_product.shop_id}/{new_product.id}/set-quantity/1',
+            headers = authorization_param
+        )
+
+        if response.status_code != 202:
+            assert False
+            return
+        returned_cart = Cart(**response.json())
+
+        assert returned_cart.products[new_product.id].quantity == 1
+        assert returned_cart.products[new_product.id].unit_price == new_product.price
+
     def test_get_my_cart(self):
         """
         Verifica que el endpoint retorna el carrito correcto.  
@@ -0,0 +1,82 @@
+# Python
+import asyncio
+
+# util
+from util.loader import DataLoader
+
+
+class TestDataLoader:
+    """
+    Run ```pytest -q test/test_loader.py```
+    """
+
+    def test_batches_ids_of_one_iteration(self):
+        """
+        Verifica que los IDs pedidos en la misma iteracion del event loop se
+        leen en una sola llamada y que cada ID se lee una vez por loader.  
+        - Test: util > loader.py > DataLoader.load()
+        """
+        batches = []
+
+        async def find(ids: list[str]):
+            batches.append(list(ids))
+            return {id: {"id": id} for id in ids if id != "missing"}
+
+        async def main():
+            loader = DataLoader(find)
+            first = await asyncio.gather(
+                loader.load("1"),
+                loader.load("2"),
+                loader.load("1"),
+                loader.load("missing")
+            )
+            second = await loader.load("2")
+            return first, second
+
+        first, second = asyncio.run(main())
+
+        assert batches == [["1", "2", "missing"]]
+        assert first == [{"id": "1"}, {"id": "2"}, {"id": "1"}, None]
+        assert second == {"id": "2"}
+
+    def test_returns_copies(self):
+        """
+        Verifica que modificar un documento cargado no cambia el memoizado.  
+        - Test: util > loader.py > DataLoader.load()
+        """
+        async def find(ids: list[str]):
+            return {id: {"id": id, "version": 1} for id in ids}
+
+        async def main():
+            loader = DataLoader(find)
+            document = await loader.load("1")
+            document.pop("version")
+            return await loader.load("1")
+
+        assert asyncio.run(main()) == {"id": "1", "version": 1}
+
+    def test_failed_batch_is_read_again(self):
+        """
+        Verifica que un error llega a quien espera y que el ID se vuelve a leer.  
+        - Test: util > loader.py > DataLoader.load()
+        """
+        calls = []
+
+        async def find(ids: list[str]):
+            calls.append(list(ids))
+            if len(calls) == 1:
+                raise ConnectionError("down")
+            return {id: {"id": id} for id in ids}
+
+        async def main():
+            loader = DataLoader(find)
+            try:
+                await loader.load("1")
+            except ConnectionError:
+                pass
+            else:
+                assert False
+            return await loader.load("1")
+
+        assert asyncio.run(main()) == {"id": "1"}
+        assert calls == [["1"], ["1"]]
@@ -0,0 +1,32 @@
+# FastAPI
+from fastapi.testclient import TestClient
+
+# app
+from main import app
+
+
+client = TestClient(app)
+
+
+class TestMetricsRouter:
+    """
+    Run ```pytest -q test/test_metrics_router.py```
+    """
+
+    def test_get_metrics(self):
+        """
+        Verifica que las metricas incluyen la ruta consultada y los comandos de Mongo.  
+        - Test: routers > metrics.py > get_metrics()
+        - Path: metrics
+        - Method: GET
+        """
+        client.get(url = f'shops/{"65133250769b9799befb1630"}')
+
+        response = client.get(url = "metrics")
+
+        if response.status_code != 200:
+            assert False
+            return
+
+        assert 'route="/shops/{id}"' in response.text
+        assert "mongodb_command_duration_seconds" in response.text
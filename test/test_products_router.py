@@ -127,7 +127,7 @@ class TestProductsRouter:
             assert False
             return
 
-        for item in response.json():
+        for item in response.json()["items"]:
             product = ProductDb(**item)
             assert product.name == new_product.name.lower()
 
@@ -151,7 +151,7 @@ class TestProductsRouter:
         )
 
         assert response.status_code == 200
-        assert len(response.json()) == 0
+        assert len(response.json()["items"]) == 0
 
     def test_get_less_or_equal_than_25_products(self):
         """
@@ -170,8 +170,55 @@ class TestProductsRouter:
             assert False
             return
         
-        assert len(response.json()) <= 25
-        assert len(response.json()) >= 0
+        assert len(response.json()["items"]) <= 25
+        assert len(response.json()["items"]) >= 0
+
+    def test_search_products(self):
+        """
+        Verifica que la busqueda retorna el producto insertado.  
+        - Test: routers > products.py > search_products()
+        - Path: products/search
+        - Method: GET
+        - Query param:
+            - q: <text to search>
+            - shop_id: <shop's ID>
+        """
+        param = {
+            "q": new_product.name,
+            "shop_id": new_product.shop_id
+        }
+        response = client.get(
+            url = "products/search",
+            params = param
+        )
+
+        if response.status_code != 200:
+            assert False
+            return
+
+        assert new_product.id in [item["id"] for item in response.json()]
+
+    def test_autocomplete_products(self):
+        """
+        Verifica que las sugerencias empiezan con el prefijo.  
+        - Test: routers > products.py > autocomplete_products()
+        - Path: products/autocomplete
+        - Method: GET
+        - Query param:
+            - prefix: <start of the product's name>
+        """
+        prefix = new_product.name[:6].upper()
+        response = client.get(
+            url = "products/autocomplete",
+            params = {"prefix": prefix}
+        )
+
+        if response.status_code != 200:
+            assert False
+            return
+
+        for item in response.json():
+            assert item["name"].lower().startswith(prefix.lower())
     
     def test_update_valid_stock_of_product(self):
         """
@@ -203,7 +250,150 @@ class TestProductsRouter:
         
         assert new_product.id == inserted_product.id
         assert inserted_product.stock == stock
-    
+
+    def test_get_product_after_update_stock(self):
+        """
+        Verifica que el producto no se sirve desactualizado desde la cache.
+        - Test: routers > products.py > get_product()
+        - Path: products/{shop_id}/{product_id}
+        - Method: GET
+        - Path param:
+            - shop_id: <shop's ID>
+            - product_id: <product's ID>
+        """
+        response = client.get(
+            url = f'products/{new_product.shop_id}/{new_product.id}',
+        )
+
+        if response.status_code != 200:
+            assert False
+            return
+
+        assert ProductDb(**response.json()).stock == 5
+
+    def test_update_products_in_bulk(self):
+        """
+        Verifica que se aplican los cambios al producto.  
+        - Test: routers > products.py > update_products()
+        - Path: products/{shop_id}/bulk
+        - Method: PATCH
+        - Path param:
+            - shop_id: <shop's ID>
+        - Header param:
+            - Authorization: Bearer <access_token>
+        - Body param:
+            - changes: <list of ProductChange>
+        """
+        global access_token
+        authorization_param = {
+            "Authorization": f'Bearer {access_token}'
+        }
+        changes = [
+            {
+                "product_id": new_product.id,
+                "adjust_stock": 1,
+                "set_price": 99.5
+            }
+        ]
+        response = client.patch(
+            url = f'products/{new_product.shop_id}/bulk',
+            headers = authorization_param,
+            json = changes
+        )
+
+        if response.status_code != 200:
+            assert False
+            return
+
+        assert response.json()["matched"] == 1
+        assert response.json()["modified"] == 1
+
+    def test_insert_products_in_bulk(self):
+        """
+        Verifica que se insertan las filas validas y se reportan las invalidas.  
+        - Test: routers > products.py > insert_products()
+        - Path: products/register/{shop_id}/bulk
+        - Method: POST
+        - Path param:
+            - shop_id: <shop's ID>
+        - Header param:
+            - Authorization: Bearer <access_token>
+        - Body: <one product per line (NDJSON)>
+        """
+        global access_token
+        authorization_param = {
+            "Authorization": f'Bearer {access_token}',
+            "Content-Type": "application/x-ndjson"
+        }
+        valid_product = ProductDb(
+            name = f'Test product {str(randint(1000, 9999))}',
+            price = randint(1, 1000),
+            stock = randint(1, 15)
+        )
+        body = "\n".join(
+            [
+                valid_product.model_dump_json(exclude={"shop_id"}),
+                '{"name": "Test product without price", "stock": 1}'
+            ]
+        )
+        response = client.post(
+            url = f'products/register/{new_product.shop_id}/bulk',
+            headers = authorization_param,
+            content = body
+        )
+
+        if response.status_code != 201:
+            assert False
+            return
+
+        assert response.json()["inserted"] == 1
+        assert response.json()["errors"][0]["row"] == 2
+
+        db_client.products_db.delete_one({"id": valid_product.id})
+
+    def test_insert_products_in_bulk_from_csv(self):
+        """
+        Verifica que se importa un CSV con una descripcion de varias lineas
+        y la columna id vacia.  
+        - Test: routers > products.py > insert_products()
+        - Path: products/register/{shop_id}/bulk
+        - Method: POST
+        - Path param:
+            - shop_id: <shop's ID>
+        - Header param:
+            - Authorization: Bearer <access_token>
+        - Body: <CSV with a header line>
+        """
+        global access_token
+        authorization_param = {
+            "Authorization": f'Bearer {access_token}',
+            "Content-Type": "text/csv"
+        }
+        name = f'Test product {str(randint(1000, 9999))}'
+        body = "\n".join(
+            [
+                "id,name,price,stock,description",
+                f',{name},10,2,"First line\nsecond line"'
+            ]
+        )
+        response = client.post(
+            url = f'products/register/{new_product.shop_id}/bulk',
+            headers = authorization_param,
+            content = body
+        )
+
+        if response.status_code != 201:
+            assert False
+            return
+
+        assert response.json()["inserted"] == 1
+        assert response.json()["errors"] == []
+
+        product = db_client.products_db.find_one({"name": name})
+        assert product["description"] == "First line\nsecond line"
+
+        db_client.products_db.delete_one({"name": name})
+
     def test_delete_valid_product(self):
         returned_data = db_client.products_db.delete_one(
             {"id": new_product.id}
@@ -0,0 +1,131 @@
+# Python
+import asyncio
+
+# FastAPI
+from fastapi import HTTPException
+
+# security
+from security import rate_limiter
+from security.rate_limiter import RateLimiter
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakePipeline:
+    """
+    Pipeline de Redis que devuelve ``totals`` como resultado de cada incrby.
+    """
+
+    def __init__(self, totals: list[int]):
+        self.totals = totals
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def incrby(self, key: str, count: int):
+        self.commands.append(("incrby", key, count))
+
+    def expire(self, key: str, seconds: int):
+        self.commands.append(("expire", key, seconds))
+
+    async def execute(self):
+        return [value for total in self.totals for value in (total, True)]
+
+
+class FakeRedis:
+    def __init__(self, totals: list[int]):
+        self.pipeline_used = FakePipeline(totals)
+
+    def pipeline(self, transaction: bool = True):
+        return self.pipeline_used
+
+
+def limiter_with_clock(monkeypatch, limit: str):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter, "monotonic", clock)
+    monkeypatch.setattr(rate_limiter, "redis_client", None)
+    return RateLimiter("test", limit), clock
+
+
+class TestRateLimiter:
+    """
+    Run ```pytest -q test/test_rate_limiter.py```
+    """
+
+    def test_refill_of_tokens(self, monkeypatch):
+        """
+        Verifica que el bucket se vacia y se recarga con el tiempo.  
+        - Test: security > rate_limiter.py > RateLimiter.hit()
+        """
+        limiter, clock = limiter_with_clock(monkeypatch, "2/10")
+
+        assert limiter.hit("client") == 0
+        assert limiter.hit("client") == 0
+        assert limiter.hit("client") == 5
+
+        clock.now += 5
+        assert limiter.hit("client") == 0
+        assert limiter.hit("client") > 0
+
+    def test_retry_after_header(self, monkeypatch):
+        """
+        Verifica que se responde 429 con el Retry-After redondeado hacia arriba.  
+        - Test: security > rate_limiter.py > RateLimiter.check()
+        """
+        limiter, clock = limiter_with_clock(monkeypatch, "1/4")
+
+        limiter.check("client")
+        try:
+            limiter.check("client")
+        except HTTPException as error:
+            assert error.status_code == 429
+            assert error.headers["Retry-After"] == "5"
+            return
+        assert False
+
+    def test_blocked_until_after_sync(self, monkeypatch):
+        """
+        Verifica que tras sincronizar con Redis una clave sobre el limite
+        queda bloqueada hasta el final de la ventana.  
+        - Test: security > rate_limiter.py > RateLimiter.sync()
+        """
+        limiter, clock = limiter_with_clock(monkeypatch, "3/10")
+        monkeypatch.setattr(rate_limiter, "time", lambda: 95.0)
+
+        assert limiter.hit("client") == 0
+        redis = FakeRedis(totals=[3])
+        monkeypatch.setattr(rate_limiter, "redis_client", redis)
+        asyncio.run(limiter.sync())
+
+        assert redis.pipeline_used.commands[0] == ("incrby", "rate_limit:test:client:9", 1)
+        assert limiter.buckets["client"].pending == 0
+        assert limiter.buckets["client"].blocked_until == clock.now + 5
+        assert limiter.hit("client") == 5
+
+    def test_evict_idle_buckets(self, monkeypatch):
+        """
+        Verifica que se descartan los buckets sin uso durante una ventana,
+        pero no los que tienen peticiones sin sincronizar.  
+        - Test: security > rate_limiter.py > RateLimiter.evict_idle()
+        """
+        limiter, clock = limiter_with_clock(monkeypatch, "3/10")
+
+        limiter.hit("idle")
+        limiter.buckets["idle"].pending = 0
+        limiter.hit("pending")
+
+        clock.now += 10
+        limiter.evict_idle()
+
+        assert "idle" not in limiter.buckets
+        assert "pending" in limiter.buckets
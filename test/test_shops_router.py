@@ -101,6 +101,31 @@ class TestShopsRouter:
 
         assert_equal_shop(inserted_shop, new_shop)
     
+    def test_get_not_modified_shop(self):
+        """
+        Verifica que el endpoint responde 304 si la tienda no cambio.  
+        - Test: routers > shops.py > get_shop()
+        - Path: shops/{id}
+        - Method: GET
+        - Path param:
+            - id: <shop's ID>
+        - Header param:
+            - If-None-Match: <ETag of the previous response>
+        """
+        response = client.get(
+            url = f'shops/{new_shop.id}'
+        )
+
+        if response.status_code != 200:
+            assert False
+            return
+        response = client.get(
+            url = f'shops/{new_shop.id}',
+            headers = {"If-None-Match": response.headers["ETag"]}
+        )
+
+        assert response.status_code == 304
+
     def test_get_shop_by_invalid_id(self):
         """
         Verifica que el endpoint no retorna una tienda.  
@@ -173,8 +198,37 @@ class TestShopsRouter:
         )
 
         assert response.status_code == 200
-        assert len(response.json()) <= 25
-        assert len(response.json()) >= 0
+        assert len(response.json()["items"]) <= 25
+        assert len(response.json()["items"]) >= 0
+
+    def test_get_next_page_of_shops(self):
+        """
+        Verifica que la siguiente pagina no repite tiendas.  
+        - Test: routers > shops.py > get_shops()
+        - Path: shops/
+        - Method: GET
+        - Query param:
+            - limit: <page size>
+            - cursor: <next_cursor of the previous page>
+        """
+        first_page = client.get(
+            url = "shops",
+            params = {"limit": 1}
+        ).json()
+
+        if not first_page["next_cursor"]:
+            return
+        response = client.get(
+            url = "shops",
+            params = {
+                "limit": 1,
+                "cursor": first_page["next_cursor"]
+            }
+        )
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 1
+        assert response.json()["items"][0]["id"] > first_page["items"][0]["id"]
 
     def test_delete_valid_shop(self):
         """
@@ -202,6 +256,33 @@ class TestShopsRouter:
 
         assert response.json() == True
 
+    def test_get_deletion_of_deleted_shop(self):
+        """
+        Verifica que el endpoint retorna el progreso de la eliminacion.  
+        - Test: routers > shops.py > get_shop_deletion()
+        - Path: shops/{id}/deletion
+        - Method: GET
+        - Path param:
+            - id: <shop's ID>
+        - Header param:
+            - Authorization: Bearer <access_token>
+        """
+        global access_token
+        authorization_param = {
+            "Authorization": f'Bearer {access_token}'
+        }
+        response = client.get(
+            url = f'shops/{new_shop.id}/deletion',
+            headers = authorization_param
+        )
+
+        if response.status_code != 200:
+            assert False
+            return
+
+        assert response.json()["shop_id"] == new_shop.id
+        assert response.json()["status"] in ["pending", "running", "done"]
+
     def test_delete_invalid_shop(self):
         """
         Verifica que el endpoint no elimina una tienda.  
@@ -0,0 +1,57 @@
+# Python
+import asyncio
+
+# util
+from util.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """
+    Run ```pytest -q test/test_singleflight.py```
+    """
+
+    def test_concurrent_calls_share_one_read(self):
+        """
+        Verifica que las llamadas concurrentes con la misma clave comparten
+        una sola lectura.  
+        - Test: util > singleflight.py > SingleFlight.do()
+        """
+        calls = []
+
+        async def read(id: str):
+            calls.append(id)
+            await asyncio.sleep(0.01)
+            return {"id": id}
+
+        async def main():
+            flight = SingleFlight("test")
+            results = await asyncio.gather(
+                *[flight.do(("shops", "1"), read, "1") for _ in range(20)],
+                flight.do(("shops", "2"), read, "2")
+            )
+            return flight, results
+
+        flight, results = asyncio.run(main())
+
+        assert sorted(calls) == ["1", "2"]
+        assert all(result == {"id": "1"} for result in results[:20])
+        assert results[20] == {"id": "2"}
+        assert flight.stats()["shared"] == 19
+        assert flight.stats()["in_flight"] == 0
+
+    def test_later_call_reads_again(self):
+        """
+        Verifica que una llamada posterior a la lectura vuelve a leer.  
+        - Test: util > singleflight.py > SingleFlight.do()
+        """
+        calls = []
+
+        async def read():
+            calls.append(1)
+            return len(calls)
+
+        async def main():
+            flight = SingleFlight("test")
+            return [await flight.do("key", read), await flight.do("key", read)]
+
+        assert asyncio.run(main()) == [1, 2]
@@ -0,0 +1,104 @@
+# Python
+from random import randint
+
+# FastAPI
+from fastapi.testclient import TestClient
+
+# app
+from main import app
+
+# models
+from models.ticket import Ticket
+
+# test
+from test.util import get_access_token
+
+
+client = TestClient(app)
+
+access_token = get_access_token()
+
+
+class TestTicketsRouter:
+    """
+    Run ```pytest -q test/test_tickets_router.py```
+    """
+
+    def test_get_my_tickets(self):
+        """
+        Verifica que el endpoint retorna mis compras, las mas nuevas primero.  
+        - Test: routers > tickets.py > get_my_tickets()
+        - Path: tickets/my
+        - Method: GET
+        - Header param:
+            - Authorization: Bearer <access_token>
+        """
+        global access_token
+        authorization_param = {
+            "Authorization": f'Bearer {access_token}'
+        }
+        response = client.get(
+            url = "tickets/my",
+            headers = authorization_param
+        )
+
+        if response.status_code != 200:
+            assert False
+            return
+        tickets = [Ticket(**item) for item in response.json()["items"]]
+
+        assert len(tickets) <= 25
+        for ticket in tickets:
+            assert ticket.user_id == "6515ba03cab17aef182c8a0a"
+        for newer, older in zip(tickets, tickets[1:]):
+            assert newer.release_date >= older.release_date
+
+    def test_get_my_tickets_with_invalid_access_token(self):
+        """
+        Verifica que el endpoint no retorna tickets.  
+        - Test: routers > tickets.py > get_my_tickets()
+        - Path: tickets/my
+        - Method: GET
+        - Header param:
+            - Authorization: Bearer <access_token>
+        """
+        global access_token
+        authorization_param = {
+            "Authorization": f'Bearer {access_token}{randint(100, 999)}'
+        }
+        response = client.get(
+            url = "tickets/my",
+            headers = authorization_param
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"]["errmsg"] == "Could not validate credentials"
+
+    def test_get_sales_of_my_shop(self):
+        """
+        Verifica que el endpoint retorna solo lineas de mi tienda.  
+        - Test: routers > tickets.py > get_shop_tickets()
+        - Path: tickets/shop/{shop_id}
+        - Method: GET
+        - Path param:
+            - shop_id: <shop's ID>
+        - Header param:
+            - Authorization: Bearer <access_token>
+        """
+        global access_token
+        authorization_param = {
+            "Authorization": f'Bearer {access_token}'
+        }
+        response = client.get(
+            url = f'tickets/shop/{"65133250769b9799befb1630"}',
+            headers = authorization_param
+        )
+
+        if response.status_code != 200:
+            assert False
+            return
+
+        for item in response.json()["items"]:
+            ticket = Ticket(**item)
+            for line in ticket.items:
+                assert line.shop_id == "65133250769b9799befb1630"
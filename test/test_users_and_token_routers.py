@@ -172,8 +172,8 @@ class TestUsersAndTokenRouters:
         )
 
         assert response.status_code == 200
-        assert len(response.json()) <= 25
-        assert len(response.json()) >= 0
+        assert len(response.json()["items"]) <= 25
+        assert len(response.json()["items"]) >= 0
 
     def test_get_access_token_with_a_valid_user(self):
         """
@@ -0,0 +1,127 @@
+# Python
+import csv
+from collections import deque
+
+# FastAPI
+from fastapi import Request
+
+# orjson
+import orjson
+
+
+async def read_lines(request: Request):
+    """
+    Splits the request body into lines as it arrives, without loading
+    the whole body in memory. A line that is not valid UTF-8 is yielded
+    as None.
+    """
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield decode_line(line)
+    if buffer:
+        yield decode_line(buffer)
+
+
+def decode_line(line: bytes):
+    try:
+        return line.decode().rstrip("\r")
+    except UnicodeDecodeError:
+        return None
+
+
+async def read_csv_records(lines):
+    """
+    Groups the lines of a CSV body into records, keeping newlines inside
+    quoted fields: while a record has an odd number of quotes, the next
+    line belongs to it. Yields the record's lines, or None for a line that
+    is not valid UTF-8.
+    """
+    record = []
+    quotes = 0
+    async for line in lines:
+        if line is None:
+            record = []
+            quotes = 0
+            yield None
+            continue
+        if not record and not line.strip():
+            continue
+
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            yield record
+            record = []
+            quotes = 0
+
+    if record:
+        yield record
+
+
+async def read_rows(request: Request):
+    """
+    Yields ``(row_number, row, error)`` for each non-empty line of an NDJSON
+    body, or for each record of a CSV body with a header line when the
+    content type is text/csv. Empty CSV values are left out of the row, so
+    the model defaults apply.
+    """
+    lines = read_lines(request)
+    is_csv = request.headers.get("content-type", "").startswith("text/csv")
+
+    row_number = 0
+    if is_csv:
+        # one reader for the whole body, fed a record at a time
+        feed = deque()
+        reader = csv.reader(iter(feed.popleft, None))
+        header = None
+        async for record in read_csv_records(lines):
+            if record is None:
+                row_number += 1
+                yield row_number, None, "Invalid UTF-8"
+                continue
+
+            feed.extend(f'{line}\n' for line in record)
+            try:
+                values = next(reader)
+            except csv.Error as error:
+                feed.clear()
+                row_number += 1
+                yield row_number, None, f'Invalid CSV: {error}'
+                continue
+
+            if header is None:
+                header = values
+                continue
+
+            row_number += 1
+            if len(values) != len(header):
+                yield row_number, None, "Wrong number of columns"
+                continue
+            yield row_number, {
+                key: value
+                for key, value in zip(header, values)
+                if value != ""
+            }, None
+        return
+
+    async for line in lines:
+        if line is None:
+            row_number += 1
+            yield row_number, None, "Invalid UTF-8"
+            continue
+        if not line.strip():
+            continue
+
+        row_number += 1
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield row_number, None, "Invalid JSON"
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, "Row is not a JSON object"
+            continue
+        yield row_number, row, None
@@ -0,0 +1,195 @@
+# Python
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Union
+
+# PyMongo
+from bson import json_util
+
+# security
+from security.config import settings
+
+
+# naive UTC datetimes, as PyMongo returns them
+JSON_OPTIONS = json_util.JSONOptions(tz_aware=False)
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries expire ``ttl`` seconds after being set.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__data = OrderedDict()
+        self.__lock = Lock()
+
+    def get(self, key: str):
+        with self.__lock:
+            item = self.__data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expires, value = item
+            if expires < monotonic():
+                del self.__data[key]
+                self.misses += 1
+                return None
+
+            self.__data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value):
+        with self.__lock:
+            self.__data[key] = (monotonic() + self.ttl, value)
+            self.__data.move_to_end(key)
+            while len(self.__data) > self.maxsize:
+                self.__data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self.__lock:
+            self.__data.pop(key, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__data.clear()
+
+    def __len__(self):
+        return len(self.__data)
+
+
+class RedisCache:
+    """
+    Shared cache tier stored in Redis. Values are stored as Extended JSON,
+    so datetimes come back as datetimes.
+    """
+
+    def __init__(self, url: str, prefix: str, ttl: float):
+        # redis is only required when a shared tier is configured
+        from redis import asyncio as aioredis
+
+        self.prefix = prefix
+        self.ttl = ttl
+        self.__client = aioredis.from_url(url)
+
+    async def get(self, key: str):
+        value = await self.__client.get(f'{self.prefix}:{key}')
+        if value is None:
+            return None
+        return json_util.loads(value, json_options=JSON_OPTIONS)
+
+    async def set(self, key: str, value):
+        await self.__client.set(
+            f'{self.prefix}:{key}',
+            json_util.dumps(value, json_options=JSON_OPTIONS),
+            px = int(self.ttl * 1000)
+        )
+
+    async def delete(self, key: str):
+        await self.__client.delete(f'{self.prefix}:{key}')
+
+
+class MemoryCache:
+    """
+    Stand-in for RedisCache (cache_redis_url = "memory://") to run the
+    shared tier without a Redis server, e.g. in tests. Values go through
+    the same serialization as in Redis.
+    """
+
+    def __init__(self, prefix: str, ttl: float):
+        self.prefix = prefix
+        self.__data = TTLCache(maxsize=1000000, ttl=ttl)
+
+    async def get(self, key: str):
+        value = self.__data.get(key)
+        if value is None:
+            return None
+        return json_util.loads(value, json_options=JSON_OPTIONS)
+
+    async def set(self, key: str, value):
+        self.__data.set(key, json_util.dumps(value, json_options=JSON_OPTIONS))
+
+    async def delete(self, key: str):
+        self.__data.delete(key)
+
+
+class Cache:
+    """
+    Local TTLCache in front of an optional RedisCache. A value found only in
+    Redis is copied into the local tier.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        ttl: float,
+        remote: Union[RedisCache, MemoryCache, None] = None
+    ):
+        self.name = name
+        self.local = TTLCache(maxsize, ttl)
+        self.remote = remote
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str):
+        """
+        Cached value of ``key`` or None. Don't modify the returned value,
+        it is shared with other readers of the local tier.
+        """
+        value = self.local.get(key)
+        if value is None and self.remote is not None:
+            value = await self.remote.get(key)
+            if value is not None:
+                self.local.set(key, value)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value):
+        self.local.set(key, value)
+        if self.remote is not None:
+            await self.remote.set(key, value)
+
+    async def delete(self, key: str):
+        self.local.delete(key)
+        if self.remote is not None:
+            await self.remote.delete(key)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0,
+            "local_hits": self.local.hits,
+            "local_misses": self.local.misses,
+            "size": len(self.local),
+            "maxsize": self.local.maxsize,
+            "ttl": self.local.ttl,
+            "shared": self.remote is not None
+        }
+
+
+caches: dict[str, Cache] = {}
+
+
+def create_cache(name: str, maxsize: int, ttl: float):
+    remote = None
+    if settings.cache_redis_url == "memory://":
+        remote = MemoryCache(name, ttl)
+    elif settings.cache_redis_url:
+        remote = RedisCache(settings.cache_redis_url, name, ttl)
+
+    cache = Cache(name, maxsize, ttl, remote)
+    caches[name] = cache
+    return cache
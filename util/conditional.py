@@ -0,0 +1,110 @@
+# Python
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import sha1
+from typing import Union
+
+# FastAPI
+from fastapi import Request, Response, status
+
+
+VERSION_FIELDS = ("version", "updated_at")
+VERSION_PROJECTION = {"id": 1, "version": 1, "updated_at": 1, "_id": 0}
+
+
+def new_version():
+    """
+    Version fields stored with a new shop or product.
+    """
+    return {"version": 1, "updated_at": datetime.utcnow()}
+
+
+def with_next_version(update: dict):
+    """
+    Adds to ``update`` the operators that bump the version of the document.
+    Every write to a shop or product goes through here.
+    """
+    update.setdefault("$inc", {})["version"] = 1
+    update.setdefault("$set", {})["updated_at"] = datetime.utcnow()
+    return update
+
+
+def pop_versions(documents: list[dict]):
+    """
+    Removes the version fields from ``documents`` (they are not part of
+    the response body) and returns them.
+    """
+    return [
+        {
+            "id": document.get("id"),
+            **{field: document.pop(field, None) for field in VERSION_FIELDS}
+        }
+        for document in documents
+    ]
+
+
+def validators(versions: list[dict], single: bool = False):
+    """
+    ETag and Last-Modified of one document (``single``) or of a list of
+    documents, from their ``id``/``version``/``updated_at``.
+
+    A list has no Last-Modified: its newest ``updated_at`` does not move
+    when a document leaves the list, so If-Modified-Since would answer
+    304 for a changed page. Lists are only revalidated by ETag, which
+    covers the IDs.
+    """
+    if not single:
+        digest = sha1(
+            ",".join(
+                f'{version["id"]}:{version.get("version") or 0}'
+                for version in versions
+            ).encode()
+        ).hexdigest()
+        return f'W/"{digest}"', None
+
+    version = versions[0]
+    etag = f'W/"{version["id"]}-{version.get("version") or 0}"'
+    return etag, version.get("updated_at")
+
+
+def conditional_headers(etag: str, last_modified: Union[datetime, None]):
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache"
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.replace(tzinfo=timezone.utc),
+            usegmt = True
+        )
+    return headers
+
+
+def is_conditional(request: Request):
+    return (
+        "if-none-match" in request.headers
+        or "if-modified-since" in request.headers
+    )
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Union[datetime, None]):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
+def not_modified(headers: dict):
+    return Response(
+        status_code = status.HTTP_304_NOT_MODIFIED,
+        headers = headers
+    )
@@ -0,0 +1,117 @@
+# Python
+from itertools import count
+
+# database
+from database.mongo_client import AsyncMongoDB
+
+# security
+from security.config import settings
+
+# models
+from models.shop import Shop
+from models.product import ProductDb
+
+# util
+from util.cache import TTLCache, create_cache
+from util.singleflight import create_flight
+from util.conditional import VERSION_FIELDS
+from util.projection import model_projection
+
+
+db_client = AsyncMongoDB()
+
+shop_cache = create_cache(
+    "shops",
+    maxsize = settings.document_cache_maxsize,
+    ttl = settings.document_cache_ttl
+)
+product_cache = create_cache(
+    "products",
+    maxsize = settings.document_cache_maxsize,
+    ttl = settings.document_cache_ttl
+)
+
+SHOP_CACHE_PROJECTION = model_projection(Shop, "deleted", *VERSION_FIELDS)
+PRODUCT_CACHE_PROJECTION = model_projection(ProductDb, *VERSION_FIELDS)
+
+# a hot document that is not cached yet is read once, not once per request
+document_reads = create_flight("documents")
+
+# stamp of the last invalidation of each cached document, kept long
+# enough to outlive the reads that started before it
+invalidations = TTLCache(maxsize=settings.document_cache_maxsize, ttl=60)
+invalidation_stamps = count(1)
+
+
+def invalidation_stamp(cache, id: str):
+    return invalidations.get(f'{cache.name}:{id}') or 0
+
+
+async def find_documents(cache, collection, projection: dict, ids: list[str]):
+    """
+    Read-through lookup of many documents by ID: cache hits first, then
+    one ``$in`` query for the misses. Returns ``{id: document}`` without
+    the IDs that don't exist. The documents may be shared with the cache,
+    don't modify them.
+    """
+    documents = {}
+    missing = []
+    for id in ids:
+        document = await cache.get(id)
+        if document is None:
+            missing.append(id)
+        else:
+            documents[id] = document
+
+    if missing:
+        # the stamps are part of the flight key: a request that comes after
+        # an invalidation doesn't join a read that started before it
+        stamps = {id: invalidation_stamp(cache, id) for id in missing}
+        found = await document_reads.do(
+            (collection.name, tuple(stamps.items())),
+            collection.find,
+            {"id": {"$in": missing}},
+            projection
+        )
+        for document in found:
+            id = document["id"]
+            documents[id] = document
+            # invalidated while the read was in flight, the document may
+            # predate the write: don't put it back in the cache
+            if invalidation_stamp(cache, id) == stamps[id]:
+                await cache.set(id, document)
+
+    return documents
+
+
+async def find_shops(ids: list[str]):
+    """
+    Shop documents with the response fields, the version fields and
+    ``deleted``.
+    """
+    return await find_documents(shop_cache, db_client.shops_db, SHOP_CACHE_PROJECTION, ids)
+
+
+async def find_products(ids: list[str]):
+    """
+    Product documents with the response and version fields.
+    """
+    return await find_documents(product_cache, db_client.products_db, PRODUCT_CACHE_PROJECTION, ids)
+
+
+# misses are not cached, so inserts don't need to invalidate anything;
+# every update or delete of a shop or product calls one of these
+
+
+async def invalidate(cache, id: str):
+    invalidations.set(f'{cache.name}:{id}', next(invalidation_stamps))
+    await cache.delete(id)
+
+
+async def invalidate_shop(id: str):
+    await invalidate(shop_cache, id)
+
+
+async def invalidate_products(ids: list[str]):
+    for id in ids:
+        await invalidate(product_cache, id)
@@ -0,0 +1,29 @@
+# database
+from database.mongo_client import AsyncMongoDB
+
+
+db_client = AsyncMongoDB()
+
+USERNAME_COLLATION = {"locale": "en", "strength": 2}
+
+
+async def exist_username(username: str):
+    user = await db_client.users_db.find_one(
+        {"username": username},
+        {"_id": 1},
+        collation = USERNAME_COLLATION
+    )
+    return user is not None
+
+
+async def exist_shop_name(name: str):
+    shop = await db_client.shops_db.find_one(
+        {"name": name.lower(), "deleted": {"$ne": True}},
+        {"_id": 1}
+    )
+    return shop is not None
+
+
+async def exist_cart_id(id: str):
+    cart = await db_client.carts_db.find_one({"id": id}, {"_id": 1})
+    return cart is not None
@@ -0,0 +1,74 @@
+# Python
+import csv
+from enum import Enum
+from io import StringIO
+from typing import AsyncIterator
+
+# FastAPI
+from fastapi.responses import StreamingResponse
+
+# orjson
+import orjson
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv"
+}
+
+
+def csv_value(value):
+    if isinstance(value, (list, dict)):
+        return orjson.dumps(value).decode()
+    return value
+
+
+async def encode_ndjson(batches: AsyncIterator[list[dict]]):
+    async for batch in batches:
+        yield b"".join(
+            orjson.dumps(document) + b"\n" for document in batch
+        )
+
+
+async def encode_csv(batches: AsyncIterator[list[dict]], fields: list[str]):
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue().encode()
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [csv_value(document.get(field)) for field in fields]
+            for document in batch
+        )
+        yield buffer.getvalue().encode()
+
+
+def export_response(
+    batches: AsyncIterator[list[dict]],
+    format: ExportFormat,
+    fields: list[str],
+    filename: str
+):
+    """
+    Streams ``batches`` as NDJSON or CSV (one row per document, nested
+    values as JSON). Each batch is encoded and sent as soon as it arrives.
+    """
+    if format == ExportFormat.csv:
+        content = encode_csv(batches, fields)
+    else:
+        content = encode_ndjson(batches)
+
+    return StreamingResponse(
+        content,
+        media_type = MEDIA_TYPES[format],
+        headers = {
+            "Content-Disposition": f'attachment; filename="{filename}.{format.value}"'
+        }
+    )
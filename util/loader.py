@@ -0,0 +1,91 @@
+# Python
+import asyncio
+from typing import Awaitable, Callable
+
+# database
+from database.mongo_client import AsyncMongoDB
+
+# models
+from models.user import User
+
+# util
+from util.documents import find_shops, find_products
+from util.projection import model_projection
+
+
+db_client = AsyncMongoDB()
+
+# keeps the password hash out of the loaded users
+USER_PROJECTION = model_projection(User)
+
+
+async def find_users(ids: list[str]):
+    users = await db_client.users_db.find({"id": {"$in": ids}}, USER_PROJECTION)
+    return {user["id"]: user for user in users}
+
+
+class DataLoader:
+    """
+    Memoizes the documents returned by ``batch_function`` (``{id: document}``
+    for a list of IDs). The IDs requested in the same iteration of the event
+    loop, e.g. under ``asyncio.gather``, are fetched in one call.
+    """
+
+    def __init__(self, batch_function: Callable[[list[str]], Awaitable[dict]]):
+        self.batch_function = batch_function
+        self.__futures: dict[str, asyncio.Future] = {}
+        self.__pending: list[str] = []
+        self.__tasks = set()
+
+    async def load(self, id: str):
+        """
+        Document with ``id`` or None. Returns a copy the caller may modify.
+        """
+        future = self.__futures.get(id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self.__futures[id] = future
+            self.__pending.append(id)
+            if len(self.__pending) == 1:
+                task = loop.create_task(self.__dispatch())
+                self.__tasks.add(task)
+                task.add_done_callback(self.__tasks.discard)
+
+        # shielded: a cancelled caller must not cancel the other waiters
+        document = await asyncio.shield(future)
+        return None if document is None else dict(document)
+
+    async def __dispatch(self):
+        ids, self.__pending = self.__pending, []
+        try:
+            documents = await self.batch_function(ids)
+        except Exception as error:
+            # forgotten, so a later load in the request tries again
+            for id in ids:
+                self.__futures.pop(id).set_exception(error)
+            return
+
+        for id in ids:
+            self.__futures[id].set_result(documents.get(id))
+
+
+class Loader:
+    """
+    Shop, product and user lookups by ID for the lifetime of one request,
+    so each document is fetched at most once per request. Shops and
+    products also go through the document cache.
+    """
+
+    def __init__(self):
+        self.shops = DataLoader(find_shops)
+        self.products = DataLoader(find_products)
+        self.users = DataLoader(find_users)
+
+
+async def get_loader():
+    """
+    Dependency: FastAPI builds one Loader per request and shares it with
+    every dependency that asks for it.
+    """
+    return Loader()
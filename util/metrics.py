@@ -0,0 +1,110 @@
+# Python
+import os
+from time import perf_counter
+
+# FastAPI
+from fastapi import Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Prometheus
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client import CollectorRegistry, REGISTRY, CONTENT_TYPE_LATEST
+from prometheus_client import generate_latest, multiprocess
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request, until the last byte of the body is sent",
+    ["method", "route"]
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests being served",
+    ["method", "route"],
+    multiprocess_mode = "livesum"
+)
+RESPONSES = Counter(
+    "http_responses_total",
+    "Responses sent, by status code",
+    ["method", "route", "status"]
+)
+
+
+def route_path(scope: Scope):
+    """
+    Path template of the route that serves the request (``/shops/{id}``),
+    so labels don't grow with every ID.
+    """
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that records the latency, the status code and the
+    requests in progress of every HTTP route.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_path(scope)
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        status_code = 500
+        finished = False
+        start = perf_counter()
+
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            REQUEST_DURATION.labels(method, route).observe(perf_counter() - start)
+            RESPONSES.labels(method, route, str(status_code)).inc()
+            in_progress.dec()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            # the response is complete here; background tasks run after
+            # it and are not part of the request latency
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # only when no complete response was sent, e.g. on an error
+            finish()
+
+
+def metrics_response():
+    """
+    Metrics in the Prometheus text format. With several workers
+    (PROMETHEUS_MULTIPROC_DIR set) they are aggregated from all of them.
+    """
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    return Response(
+        content = generate_latest(registry),
+        media_type = CONTENT_TYPE_LATEST
+    )
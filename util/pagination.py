@@ -0,0 +1,88 @@
+# Python
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from typing import Union
+
+# PyMongo
+from bson import json_util
+from pymongo import ASCENDING
+
+# FastAPI
+from fastapi import HTTPException, status
+
+# database
+from database.mongo_client import AsyncCollection
+
+
+def encode_cursor(document: dict, sort: list[tuple[str, int]]):
+    values = [document[key] for key, _ in sort]
+    return urlsafe_b64encode(json_util.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort: list[tuple[str, int]]):
+    try:
+        values = json_util.loads(urlsafe_b64decode(cursor.encode()))
+    except (BinasciiError, ValueError, UnicodeDecodeError):
+        values = None
+
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = {
+                "errmsg": "Invalid cursor"
+            }
+        )
+    return values
+
+
+def after_cursor(values: list, sort: list[tuple[str, int]]):
+    """
+    Builds the filter of the documents that come after ``values`` in
+    ``sort`` order, e.g. for [(a, 1), (b, 1)]: a > va or (a == va and b > vb).
+    """
+    branches = []
+    for position, (key, direction) in enumerate(sort):
+        operator = "$gt" if direction == ASCENDING else "$lt"
+        branch = {
+            previous_key: values[index]
+            for index, (previous_key, _) in enumerate(sort[:position])
+        }
+        branch[key] = {operator: values[position]}
+        branches.append(branch)
+
+    if len(branches) == 1:
+        return branches[0]
+    return {"$or": branches}
+
+
+async def paginate(
+    collection: AsyncCollection,
+    query: dict,
+    limit: int,
+    cursor: Union[str, None] = None,
+    sort: list[tuple[str, int]] = [("id", ASCENDING)],
+    projection: Union[dict, None] = None
+):
+    """
+    Keyset pagination: returns up to ``limit`` documents and the cursor of
+    the next page (None on the last page). ``sort`` must end in a unique
+    key and be backed by an index, so every page is an index range scan.
+    A ``projection`` must keep the sort keys.
+    """
+    if cursor:
+        values = decode_cursor(cursor, sort)
+        query = {"$and": [query, after_cursor(values, sort)]}
+
+    documents = await collection.find(
+        query,
+        projection,
+        sort = sort,
+        limit = limit + 1
+    )
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1], sort)
+
+    return documents, next_cursor
@@ -0,0 +1,13 @@
+# Pydantic
+from pydantic import BaseModel
+
+
+def model_projection(model: type[BaseModel], *extra: str):
+    """
+    Projection that returns only the fields of ``model`` (plus ``extra``),
+    so Mongo doesn't send fields the response would drop anyway.
+    """
+    projection = {field: 1 for field in model.model_fields}
+    projection.update({field: 1 for field in extra})
+    projection["_id"] = 0
+    return projection
@@ -0,0 +1,52 @@
+# Python
+from functools import cache
+from typing import Union
+
+# FastAPI
+from fastapi import status
+from fastapi.responses import ORJSONResponse
+
+# Pydantic
+from pydantic import BaseModel
+
+
+@cache
+def model_defaults(model: type[BaseModel]):
+    return {
+        name: field.default
+        for name, field in model.model_fields.items()
+        if not field.is_required() and field.default_factory is None
+    }
+
+
+def trusted(model: type[BaseModel], document: Union[dict, None]):
+    """
+    Response body for a document that our own endpoints validated before
+    storing it, read with ``model_projection(model)``. Only fills in the
+    defaults of fields missing from older documents instead of validating
+    it again.
+    """
+    if document is None:
+        return None
+    return {**model_defaults(model), **document}
+
+
+def trusted_list(model: type[BaseModel], documents: list[dict]):
+    defaults = model_defaults(model)
+    return [{**defaults, **document} for document in documents]
+
+
+def json_response(
+    content,
+    status_code: int = status.HTTP_200_OK,
+    headers: Union[dict, None] = None
+):
+    """
+    Serializes ``content`` with orjson and skips the ``response_model``
+    validation FastAPI would otherwise run on the returned value.
+    """
+    return ORJSONResponse(
+        content = content,
+        status_code = status_code,
+        headers = headers
+    )
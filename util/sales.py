@@ -0,0 +1,91 @@
+# PyMongo
+from pymongo import UpdateOne
+
+# database
+from database.mongo_client import AsyncMongoDB
+
+# models
+from models.ticket import Ticket
+from models.sales import ProductSales, DailySales, SalesReport
+
+
+db_client = AsyncMongoDB()
+
+
+async def record_sales(ticket: Ticket):
+    """
+    Adds the lines of ``ticket`` to the daily rollup of each shop: one
+    upserted $inc per shop, so reports never have to read tickets.
+    """
+    day = ticket.release_date.date().isoformat()
+
+    updates = {}
+    for item in ticket.items:
+        revenue = item.quantity * item.unit_price
+        update = updates.setdefault(
+            item.shop_id,
+            {"$inc": {"units": 0, "revenue": 0}, "$set": {}}
+        )
+        update["$inc"]["units"] += item.quantity
+        update["$inc"]["revenue"] += revenue
+        update["$inc"][f'products.{item.product_id}.units'] = item.quantity
+        update["$inc"][f'products.{item.product_id}.revenue'] = revenue
+        update["$set"][f'products.{item.product_id}.name'] = item.name
+
+    if not updates:
+        return
+
+    await db_client.sales_db.bulk_write(
+        [
+            UpdateOne(
+                {"shop_id": shop_id, "day": day},
+                update,
+                upsert = True
+            )
+            for shop_id, update in updates.items()
+        ],
+        ordered = False
+    )
+
+
+async def sales_report(shop_id: str, start, end, top: int):
+    """
+    Totals, per-day figures and the ``top`` products by revenue of
+    ``shop_id`` between ``start`` and ``end`` (inclusive), read only from
+    the daily rollups.
+    """
+    rollups = await db_client.sales_db.find(
+        {
+            "shop_id": shop_id,
+            "day": {"$gte": start.isoformat(), "$lte": end.isoformat()}
+        },
+        {"_id": 0},
+        sort = [("day", 1)]
+    )
+
+    report = SalesReport(shop_id=shop_id, start=start, end=end)
+    products = {}
+    for rollup in rollups:
+        report.units += rollup.get("units", 0)
+        report.revenue += rollup.get("revenue", 0)
+        report.days.append(
+            DailySales(
+                day = rollup["day"],
+                units = rollup.get("units", 0),
+                revenue = rollup.get("revenue", 0)
+            )
+        )
+        for product_id, sales in rollup.get("products", {}).items():
+            product = products.setdefault(
+                product_id,
+                ProductSales(product_id=product_id, name=sales.get("name", ""))
+            )
+            product.units += sales.get("units", 0)
+            product.revenue += sales.get("revenue", 0)
+
+    report.top_products = sorted(
+        products.values(),
+        key = lambda product: product.revenue,
+        reverse = True
+    )[:top]
+    return report
@@ -0,0 +1,167 @@
+# Python
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Union
+
+# PyMongo
+from pymongo import ReturnDocument
+
+# database
+from database.mongo_client import AsyncMongoDB
+
+# security
+from security.config import settings
+
+# models
+from models.job import StatusJob, TypeJob
+
+# util
+from util.documents import invalidate_shop, invalidate_products
+
+
+db_client = AsyncMongoDB()
+logger = logging.getLogger(__name__)
+
+UNFINISHED = [StatusJob.pending, StatusJob.running]
+
+_resumed_tasks: set[asyncio.Task] = set()
+_watcher: Union[asyncio.Task, None] = None
+
+
+async def update_job(job_id: str, update: dict):
+    update.setdefault("$set", {})["updated"] = datetime.utcnow()
+    await db_client.jobs_db.update_one({"id": job_id}, update)
+
+
+async def delete_shop_products(job_id: str, shop_id: str):
+    """
+    Background job of DELETE /shops/{id}: deletes the products of the shop
+    and their cart lines in batches of ``shop_deletion_batch_size``,
+    pausing between batches, then removes the shop document. Progress is
+    recorded in the job document. A failed run is retried by the watcher.
+    """
+    await update_job(job_id, {"$set": {"status": StatusJob.running}})
+
+    try:
+        while True:
+            products = await db_client.products_db.find(
+                {"shop_id": shop_id},
+                {"id": 1, "_id": 0},
+                sort = [("id", 1)],
+                limit = settings.shop_deletion_batch_size
+            )
+            if not products:
+                break
+            ids = [product["id"] for product in products]
+
+            returned_cart_data = await db_client.carts_db.update_many(
+                {"shop_ids": shop_id},
+                {"$unset": {f'products.{id}': "" for id in ids}}
+            )
+            returned_product_data = await db_client.products_db.delete_many(
+                {"id": {"$in": ids}}
+            )
+            await invalidate_products(ids)
+            await update_job(
+                job_id,
+                {
+                    "$inc": {
+                        "deleted_products": returned_product_data.deleted_count,
+                        "cleaned_carts": returned_cart_data.modified_count
+                    }
+                }
+            )
+            await asyncio.sleep(settings.shop_deletion_pause)
+
+        await db_client.carts_db.update_many(
+            {"shop_ids": shop_id},
+            {"$pull": {"shop_ids": shop_id}}
+        )
+        await db_client.shops_db.delete_one({"id": shop_id})
+        await invalidate_shop(shop_id)
+    except Exception as error:
+        # the job stays running, so the watcher resumes it once it goes
+        # stale, until it has failed shop_deletion_max_attempts times
+        job = await db_client.jobs_db.find_one_and_update(
+            {"id": job_id},
+            {
+                "$inc": {"attempts": 1},
+                "$set": {"error": str(error), "updated": datetime.utcnow()}
+            },
+            projection = {"attempts": 1, "_id": 0},
+            return_document = ReturnDocument.AFTER
+        )
+        if job is not None and job["attempts"] >= settings.shop_deletion_max_attempts:
+            await update_job(job_id, {"$set": {"status": StatusJob.failed}})
+        raise
+
+    await update_job(job_id, {"$set": {"status": StatusJob.done}})
+
+
+async def resume_shop_deletions():
+    """
+    Restarts the shop deletions of workers that stopped halfway: jobs
+    still pending or running whose progress has not moved for
+    ``shop_deletion_stale_after`` seconds. A job is claimed by moving its
+    ``updated`` forward, so only one worker resumes it. The cleanup
+    re-queries the products by shop, so it continues where it stopped.
+    """
+    stale = datetime.utcnow() - timedelta(seconds=settings.shop_deletion_stale_after)
+    query = {
+        "type": TypeJob.delete_shop,
+        "status": {"$in": UNFINISHED},
+        "updated": {"$lt": stale}
+    }
+    jobs = await db_client.jobs_db.find(query, {"id": 1, "shop_id": 1, "_id": 0})
+
+    for job in jobs:
+        claimed = await db_client.jobs_db.find_one_and_update(
+            {**query, "id": job["id"]},
+            {"$set": {"updated": datetime.utcnow()}}
+        )
+        if claimed is None:
+            continue
+
+        task = asyncio.create_task(delete_shop_products(job["id"], job["shop_id"]))
+        _resumed_tasks.add(task)
+        task.add_done_callback(_resumed_tasks.discard)
+
+
+async def watch_shop_deletions():
+    while True:
+        try:
+            await resume_shop_deletions()
+        except Exception:
+            # e.g. Mongo unreachable for a moment; try again next round
+            logger.exception("Could not resume the shop deletions")
+        await asyncio.sleep(settings.shop_deletion_stale_after)
+
+
+def start_shop_deletion_watcher():
+    global _watcher
+    _watcher = asyncio.create_task(watch_shop_deletions())
+
+
+def stop_shop_deletion_watcher():
+    if _watcher is not None:
+        _watcher.cancel()
+
+
+async def deleted_shop_ids():
+    """
+    IDs of the shops marked as deleted whose cleanup has not finished.
+    """
+    shops = await db_client.shops_db.find({"deleted": True}, {"id": 1, "_id": 0})
+    return [shop["id"] for shop in shops]
+
+
+async def live_shop_filter(shop_id: Union[str, None] = None):
+    """
+    Condition on a product's ``shop_id`` that leaves out the products of
+    shops being deleted, optionally restricted to ``shop_id``.
+    """
+    condition = {"$nin": await deleted_shop_ids()}
+    if shop_id:
+        condition["$eq"] = shop_id
+    return condition
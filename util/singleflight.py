@@ -0,0 +1,53 @@
+# Python
+import asyncio
+from typing import Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical reads: while a call for ``key`` is in
+    flight, later calls for the same key wait for it and get its result
+    instead of querying again. Nothing is kept once the call finishes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.shared = 0
+        self.__flights: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, function, *args, **kwargs):
+        """
+        Result of ``await function(*args, **kwargs)``, shared by every
+        caller with the same ``key``. Don't modify it, other callers get
+        the same object.
+        """
+        flight = self.__flights.get(key)
+        if flight is None:
+            self.calls += 1
+            flight = asyncio.ensure_future(function(*args, **kwargs))
+            self.__flights[key] = flight
+            flight.add_done_callback(lambda _: self.__flights.pop(key, None))
+        else:
+            self.shared += 1
+
+        # shielded: a cancelled caller must not cancel the other waiters
+        return await asyncio.shield(flight)
+
+    def stats(self):
+        total = self.calls + self.shared
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "shared_ratio": self.shared / total if total else 0.0,
+            "in_flight": len(self.__flights)
+        }
+
+
+flights: dict[str, SingleFlight] = {}
+
+
+def create_flight(name: str):
+    flight = SingleFlight(name)
+    flights[name] = flight
+    return flight
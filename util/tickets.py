@@ -0,0 +1,13 @@
+def shop_ticket(ticket: dict, shop_id: str):
+    """
+    Keeps only the lines of ``shop_id`` in a stored ticket and sets its
+    price to their total.
+    """
+    ticket["items"] = [
+        item for item in ticket.get("items", [])
+        if item.get("shop_id") == shop_id
+    ]
+    ticket["price"] = sum(
+        item["quantity"] * item["unit_price"] for item in ticket["items"]
+    )
+    return ticket
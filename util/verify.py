@@ -1,23 +1,16 @@
 # FastAPI
 from fastapi import HTTPException, status
 
-# database
-from database.mongo_client import MongoDB
-
-# models
-from models.shop import Shop
-
 # util
-from util.white_lists import get_white_list_users_id, get_white_list_usernames, get_white_list_product_id_in_shop
-from util.white_lists import get_white_list_shop_id, get_white_list_shop_names
-from util.white_lists import get_white_list_cart_id
-
-
-db_client = MongoDB()
+from util.exists import exist_username
+from util.exists import exist_shop_name
+from util.exists import exist_cart_id
+from util.loader import Loader
 
 
-def verify_user_id(id: str):
-    if not id in get_white_list_users_id():
+async def verify_user_id(id: str, loader: Loader):
+    user = await loader.users.load(id)
+    if user is None:
         raise HTTPException(
             status_code = status.HTTP_400_BAD_REQUEST,
             detail = {
@@ -25,8 +18,10 @@ def verify_user_id(id: str):
             }
         )
 
-def verify_username(username: str):
-    if not username.lower() in get_white_list_usernames():
+    return user
+
+async def verify_username(username: str):
+    if not await exist_username(username):
         raise HTTPException(
             status_code = status.HTTP_400_BAD_REQUEST,
             detail = {
@@ -34,8 +29,9 @@ def verify_username(username: str):
             }
         )
 
-def verify_shop_id(id: str):
-    if not id in get_white_list_shop_id():
+async def verify_shop_id(id: str, loader: Loader):
+    shop = await loader.shops.load(id)
+    if shop is None or shop.get("deleted"):
         raise HTTPException(
             status_code = status.HTTP_400_BAD_REQUEST,
             detail = {
@@ -43,8 +39,10 @@ def verify_shop_id(id: str):
             }
         )
 
-def verify_shop_name(shop_name: str):
-    if not shop_name.lower() in get_white_list_shop_names():
+    return shop
+
+async def verify_shop_name(shop_name: str):
+    if not await exist_shop_name(shop_name):
         raise HTTPException(
             status_code = status.HTTP_400_BAD_REQUEST,
             detail = {
@@ -52,10 +50,11 @@ def verify_shop_name(shop_name: str):
             }
         )
 
-def verify_product_id_in_shop(product_id: str, shop_id: str):
-    verify_shop_id(shop_id)
+async def verify_product_id_in_shop(product_id: str, shop_id: str, loader: Loader):
+    await verify_shop_id(shop_id, loader)
 
-    if not product_id in get_white_list_product_id_in_shop(shop_id):
+    product = await loader.products.load(product_id)
+    if product is None or product.get("shop_id") != shop_id:
         raise HTTPException(
             status_code = status.HTTP_400_BAD_REQUEST,
             detail = {
@@ -63,9 +62,10 @@ def verify_product_id_in_shop(product_id: str, shop_id: str):
             }
         )
 
-def verify_owner_of_shop(shop_id: str, user_id: str):
-    verify_shop_id(shop_id)
-    shop = db_client.shops_db.find_one({"id": shop_id})
+    return product
+
+async def verify_owner_of_shop(shop_id: str, user_id: str, loader: Loader):
+    shop = await verify_shop_id(shop_id, loader)
 
     if not shop.get("owner_id") == user_id:
         raise HTTPException(
@@ -75,8 +75,10 @@ def verify_owner_of_shop(shop_id: str, user_id: str):
             }
         )
 
-def verify_cart_id(id: str):
-    if not id in get_white_list_cart_id():
+    return shop
+
+async def verify_cart_id(id: str):
+    if not await exist_cart_id(id):
         raise HTTPException(
             status_code = status.HTTP_400_BAD_REQUEST,
             detail = {